@@ -3,6 +3,15 @@ ASGI config for backendorhelo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The real-time feed (/api/flux/demandes/) needs this entry point. Set
+TRANSFERT_VUES_ASYNC=1 to also serve the auth, transfer and pending-list
+routes with the async views:
+
+    TRANSFERT_VUES_ASYNC=1 GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+
+`python manage.py comparer_sync_async` benchmarks this mode against the
+WSGI one at equal worker count.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
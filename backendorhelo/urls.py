@@ -16,10 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from transfert.metriques import format_prometheus
+from transfert.demarrage import pret
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('transfert.urls')),  # <<== Lien vers nos APIs
     path('ping/', lambda request: JsonResponse({'message': 'pong !'})),
+    path('pret/', pret),  # <<== Sonde de disponibilité (worker préchauffé)
+    path('metrics', lambda request: HttpResponse(format_prometheus(), content_type='text/plain; version=0.0.4')),
 ]
@@ -0,0 +1,59 @@
+# ⚙️ Configuration gunicorn (Procfile / render.yaml : gunicorn -c gunicorn.conf.py)
+#   WEB_CONCURRENCY        nombre de workers (2 par défaut ; 1 pour le flux SSE avec le bus en mémoire)
+#   GUNICORN_WORKER_CLASS  sync par défaut ; uvicorn.workers.UvicornWorker sert l'application ASGI
+#   GUNICORN_THREADS       threads par worker (gthread)
+#   GUNICORN_PRELOAD       1 : Django et les vues importés une fois dans le maître, hérités au fork
+#   PORT                   lu directement par gunicorn (0.0.0.0:$PORT)
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backendorhelo.settings")
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+wsgi_app = "backendorhelo.asgi:application" if "uvicorn" in worker_class else "backendorhelo.wsgi"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+
+# 🧹 Fichiers de métriques des workers d'un lancement précédent (pids morts)
+def on_starting(server):
+    from pathlib import Path
+    from django.conf import settings
+
+    for fichier in Path(settings.METRIQUES_DOSSIER).glob("metriques-*.json"):
+        fichier.unlink(missing_ok=True)
+
+
+# 🔥 Maître (après le chargement de l'application) : imports de l'urlconf et des vues avant le fork
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    from transfert.demarrage import charger_application
+
+    charger_application()
+    connections.close_all()
+
+
+# 🔥 Worker : connexion base + cache avant la première requête (état exposé par /pret/),
+#    puis écriture différée du journal d'audit et, sous SQLite, vidage de l'outbox
+def post_worker_init(worker):
+    from transfert.audit import tampon_audit
+    from transfert.demarrage import prechauffer
+    from transfert.outbox import demarrer_vidage_local
+
+    etat = prechauffer()
+    worker.log.info("Worker %s préchauffé en %s ms%s", etat["pid"], etat["prechauffage_ms"],
+                    f" (erreur : {etat['erreur']})" if etat["erreur"] else "")
+    tampon_audit.demarrer()
+    demarrer_vidage_local()
+
+
+# 📊 Dernières métriques et événements d'audit du worker écrits avant sa sortie
+def worker_exit(server, worker):
+    from transfert.audit import tampon_audit
+    from transfert.metriques import registre
+
+    registre.ecrire()
+    tampon_audit.arreter()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TransfertConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transfert'
+
+    def ready(self):
+        # 📣 Branchement des récepteurs de signaux
+        from . import audit, cache_demandes, cumuls, db, evenements, metriques, points  # noqa: F401
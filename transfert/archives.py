@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import DemandeTransfert, DemandeTransfertArchive
+
+STATUTS_ARCHIVABLES = ('valide', 'echec')
+
+# Champs recopiés tels quels (tout sauf date_archivage)
+CHAMPS_ARCHIVE = [f.attname for f in DemandeTransfertArchive._meta.concrete_fields if f.name != 'date_archivage']
+
+
+# 🔹 Déplace un lot de demandes terminées vers l'archive ; retourne le nombre déplacé
+def archiver_lot(limite, taille_lot):
+    with transaction.atomic():
+        demandes = DemandeTransfert.objects.filter(
+            statut__in=STATUTS_ARCHIVABLES, date_creation__lt=limite
+        ).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            demandes = demandes.select_for_update(skip_locked=True)
+
+        demandes = list(demandes.values(*CHAMPS_ARCHIVE)[:taille_lot])
+        if not demandes:
+            return 0
+
+        maintenant = timezone.now()
+        DemandeTransfertArchive.objects.bulk_create(
+            [DemandeTransfertArchive(date_archivage=maintenant, **demande) for demande in demandes],
+            ignore_conflicts=True
+        )
+        DemandeTransfert.objects.filter(id__in=[d['id'] for d in demandes]).delete()
+    return len(demandes)
+
+
+# 🗄️ Archivage par petits lots (transactions courtes, pause entre lots pour laisser passer les écritures)
+def archiver_demandes(age_jours, taille_lot=500, pause=0.05):
+    limite = timezone.now() - timedelta(days=age_jours)
+    total = 0
+    while True:
+        deplacees = archiver_lot(limite, taille_lot)
+        total += deplacees
+        if deplacees < taille_lot:
+            return total
+        time.sleep(pause)
+
+
+# 🔎 Recherche par id : table chaude puis archive
+def trouver_demande(id_demande):
+    for modele in (DemandeTransfert, DemandeTransfertArchive):
+        demande = modele.objects.filter(id=id_demande).first()
+        if demande is not None:
+            return demande
+    return None
@@ -0,0 +1,119 @@
+import atexit
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import EvenementAudit
+from .signals import statut_demande_change
+
+logger = logging.getLogger(__name__)
+
+
+# 🧾 Écriture différée du journal d'audit : les événements s'accumulent en mémoire et partent en un
+#    bulk_create dès TRANSFERT_AUDIT_TAILLE_LOT événements ou toutes les TRANSFERT_AUDIT_INTERVALLE
+#    secondes (thread de fond), jamais dans le chemin de la requête.
+#    demarrer() est appelé par les workers gunicorn ; ailleurs (tests, shell, runserver)
+#    chaque événement est écrit aussitôt. Arrêt brutal du worker (SIGKILL, OOM) : le tampon est perdu.
+class TamponAudit:
+    def __init__(self, taille_lot=None, intervalle=None, capacite=None):
+        self.taille_lot = taille_lot or settings.TRANSFERT_AUDIT_TAILLE_LOT
+        self.intervalle = intervalle or settings.TRANSFERT_AUDIT_INTERVALLE
+        self.capacite = capacite or settings.TRANSFERT_AUDIT_CAPACITE
+        self._verrou = threading.Lock()
+        self._ecriture = threading.Lock()
+        self._evenements = deque(maxlen=self.capacite)
+        self._actif = False
+        self._thread = None
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._atexit = False
+        self.perdus = 0
+
+    def demarrer(self, fond=True):
+        with self._verrou:
+            self._actif = True
+            if not self._atexit:
+                atexit.register(self.arreter)
+                self._atexit = True
+            if fond and (self._thread is None or not self._thread.is_alive()):
+                self._arret.clear()
+                self._thread = threading.Thread(target=self._boucle, name="audit", daemon=True)
+                self._thread.start()
+
+    # 🔹 Sortie du worker : arrêt du thread puis dernier vidage
+    def arreter(self):
+        self._arret.set()
+        self._reveil.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.intervalle + 5)
+        with self._verrou:
+            self._actif = False
+        return self.vider()
+
+    def ajouter(self, evenement):
+        with self._verrou:
+            if len(self._evenements) == self.capacite:
+                # Base indisponible depuis longtemps : on perd les plus anciens plutôt que la mémoire
+                self.perdus += 1
+                logger.warning("Audit : tampon plein, événement le plus ancien abandonné (%s au total)", self.perdus)
+            self._evenements.append(evenement)
+            tamponne = self._actif
+            plein = len(self._evenements) >= self.taille_lot
+            fond = self._thread is not None and self._thread.is_alive()
+
+        if not tamponne or (plein and not fond):
+            self.vider()
+        elif plein:
+            self._reveil.set()
+
+    def vider(self):
+        with self._ecriture:
+            with self._verrou:
+                evenements = list(self._evenements)
+                self._evenements.clear()
+            if not evenements:
+                return 0
+            try:
+                EvenementAudit.objects.bulk_create(evenements, batch_size=self.taille_lot)
+            except DatabaseError:
+                logger.exception("Audit : écriture de %s événement(s) échouée, remis dans le tampon", len(evenements))
+                with self._verrou:
+                    restants = list(self._evenements)
+                    self._evenements.clear()
+                    self._evenements.extend((evenements + restants)[-self.capacite:])
+                return 0
+        return len(evenements)
+
+    def _boucle(self):
+        try:
+            while not self._arret.is_set():
+                self._reveil.wait(self.intervalle)
+                self._reveil.clear()
+                try:
+                    self.vider()
+                finally:
+                    connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+
+tampon_audit = TamponAudit()
+
+
+# 📣 Changement de statut : événement horodaté dans la transaction, remis au tampon après commit
+@receiver(statut_demande_change)
+def auditer_changement_statut(sender, demande, ancien_statut, operateur=None, **kwargs):
+    evenement = EvenementAudit(
+        id_demande=demande.id,
+        reseau=demande.reseau,
+        ancien_statut=ancien_statut,
+        statut=demande.statut,
+        operateur=operateur,
+        code_ussd=demande.code_ussd,
+        date_creation=timezone.now(),
+    )
+    transaction.on_commit(lambda: tampon_audit.ajouter(evenement))
@@ -0,0 +1,91 @@
+import hmac
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.core import signing
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+SEL_JETON = "transfert.jeton_session"
+
+
+# 🔹 Utilisateur porté par le jeton (pas de requête en base pour authentifier)
+class UtilisateurJeton:
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id):
+        self.id = id
+        self.pk = id
+
+
+# 🔑 Jeton signé HMAC (SECRET_KEY, rotation via SECRET_KEY_FALLBACKS) avec expiration
+def emettre_jeton(utilisateur):
+    return signing.dumps({"uid": utilisateur.id}, salt=SEL_JETON, compress=False)
+
+
+def verifier_jeton(jeton):
+    try:
+        donnees = signing.loads(jeton, salt=SEL_JETON, max_age=settings.TRANSFERT_JETON_DUREE)
+    except signing.BadSignature:
+        return None
+    return donnees.get("uid")
+
+
+def reponse_jeton(utilisateur):
+    return {"jeton": emettre_jeton(utilisateur), "expire_dans": settings.TRANSFERT_JETON_DUREE}
+
+
+# 📌 Authentification DRF : "Authorization: Bearer <jeton>"
+class JetonSessionAuthentication(BaseAuthentication):
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != b"bearer":
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed("En-tête Authorization invalide.")
+
+        id_utilisateur = verifier_jeton(auth[1].decode(errors="ignore"))
+        if id_utilisateur is None:
+            raise AuthenticationFailed("Jeton invalide ou expiré.")
+
+        return UtilisateurJeton(id_utilisateur), auth[1]
+
+    def authenticate_header(self, request):
+        return "Bearer"
+
+
+# ⚡ Cache des vérifications PIN réussies : un déverrouillage répété dans la fenêtre
+#    évite le PBKDF2. La clé inclut le hash stocké, donc un changement de PIN l'invalide.
+_pins_verifies = {}
+_verrou_pins = threading.Lock()
+
+
+def _cle_pin(utilisateur, pin):
+    message = f"{utilisateur.id}:{utilisateur.code_pin}:{pin}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+
+def verifier_pin(utilisateur, pin):
+    cle = _cle_pin(utilisateur, pin)
+    maintenant = time.monotonic()
+
+    with _verrou_pins:
+        expire = _pins_verifies.get(cle)
+    if expire and expire > maintenant:
+        return True
+
+    if not check_password(pin, utilisateur.code_pin):
+        return False
+
+    with _verrou_pins:
+        if len(_pins_verifies) >= settings.TRANSFERT_CACHE_PIN_TAILLE:
+            for c in [c for c, e in _pins_verifies.items() if e <= maintenant]:
+                del _pins_verifies[c]
+            if len(_pins_verifies) >= settings.TRANSFERT_CACHE_PIN_TAILLE:
+                _pins_verifies.clear()
+        _pins_verifies[cle] = maintenant + settings.TRANSFERT_CACHE_PIN_DUREE
+    return True
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .cache_demandes import planifier_changement_version
+from .models import DemandeTransfert
+from .serializers import CHAMPS_DEMANDE
+
+
+# 🔹 Demande utilisable par cet opérateur : pas de bail, bail expiré, ou bail à lui
+def libre_pour(operateur, maintenant):
+    libre = Q(bail_expire__isnull=True) | Q(bail_expire__lte=maintenant)
+    if operateur:
+        libre |= Q(operateur=operateur)
+    return libre
+
+
+# 🙋 Réserve les `nombre` plus anciennes demandes en attente libres pour `operateur`.
+#    PostgreSQL : SELECT … FOR UPDATE SKIP LOCKED, deux opérateurs ne lisent jamais les mêmes lignes.
+#    SQLite (transaction IMMEDIATE, écritures sérialisées) : l'UPDATE conditionnel suffit.
+#    Dans les deux cas seules les lignes effectivement passées à cet opérateur sont retournées.
+def reserver_demandes(operateur, nombre, duree=None, **filtres):
+    maintenant = timezone.now()
+    expire = maintenant + timedelta(seconds=duree or settings.TRANSFERT_BAIL_DUREE)
+    libres = DemandeTransfert.objects.filter(libre_pour(None, maintenant), statut='en_attente', **filtres)
+
+    with transaction.atomic():
+        candidates = libres.order_by('date_creation', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:nombre])
+        if not ids:
+            return [], expire
+
+        libres.filter(id__in=ids).update(operateur=operateur, bail_expire=expire)
+        reservees = list(
+            DemandeTransfert.objects.filter(id__in=ids, operateur=operateur, bail_expire=expire)
+            .order_by('date_creation', 'id').values(*CHAMPS_DEMANDE)
+        )
+        planifier_changement_version(*{d['reseau'] for d in reservees})
+    return reservees, expire
+
+
+# 🔓 Rend à la file les demandes encore en attente réservées par `operateur` (toutes, ou `ids`)
+def liberer_demandes(operateur, ids=None):
+    demandes = DemandeTransfert.objects.filter(operateur=operateur, statut='en_attente', bail_expire__isnull=False)
+    if ids is not None:
+        demandes = demandes.filter(id__in=ids)
+
+    with transaction.atomic():
+        reseaux = set(demandes.values_list('reseau', flat=True).distinct())
+        liberees = demandes.update(operateur=None, bail_expire=None)
+        if liberees:
+            planifier_changement_version(*reseaux)
+    return liberees
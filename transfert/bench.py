@@ -0,0 +1,178 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+# 🏁 Outils de mesure de charge contre un gunicorn local (utilisés par les commandes de benchmark)
+
+COMMANDES_SERVEUR = {
+    "sync": ["backendorhelo.wsgi"],
+    "async": ["backendorhelo.asgi:application", "-k", "uvicorn.workers.UvicornWorker"],
+}
+
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def environnement(base_sqlite, **extra):
+    env = dict(os.environ, SQLITE_PATH=str(base_sqlite), **extra)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "backendorhelo.settings")
+    return env
+
+
+def manage(env, *args):
+    return subprocess.run(
+        [sys.executable, "manage.py", *args],
+        cwd=settings.BASE_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+
+# 🔹 Base jetable migrée + un utilisateur de test (PIN 1234) ; retourne son id
+def preparer_base(env):
+    manage(env, "migrate", "--noinput")
+    sortie = manage(env, "shell", "-c", (
+        "from django.contrib.auth.hashers import make_password\n"
+        "from transfert.models import Utilisateur\n"
+        "u, _ = Utilisateur.objects.get_or_create(numero='0700000000', "
+        "defaults={'nom_complet': 'Bench', 'code_pin': make_password('1234')})\n"
+        "print(u.id)"
+    ))
+    return int(sortie.strip().splitlines()[-1])
+
+
+@contextmanager
+def serveur(mode, workers, env, timeout=30):
+    port = port_libre()
+    if mode == "async":
+        env = dict(env, TRANSFERT_VUES_ASYNC="1")
+
+    commande = [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", *COMMANDES_SERVEUR[mode],
+        "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning",
+    ]
+    processus = subprocess.Popen(commande, cwd=settings.BASE_DIR, env=env)
+    try:
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                connexion = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+                connexion.request("GET", "/pret/")
+                if connexion.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > limite or processus.poll() is not None:
+                raise RuntimeError(f"Le serveur {mode} n'a pas démarré")
+            time.sleep(0.2)
+        yield ("127.0.0.1", port)
+    finally:
+        processus.terminate()
+        processus.wait(10)
+
+
+class Scenario:
+    def __init__(self, nom, methode, chemin, corps=None, en_tetes=None):
+        self.nom = nom
+        self.methode = methode
+        self.chemin = chemin
+        self.corps = corps
+        self.en_tetes = en_tetes or {}
+
+    def requete(self, i):
+        corps = self.corps(i) if callable(self.corps) else self.corps
+        chemin = self.chemin(i) if callable(self.chemin) else self.chemin
+        en_tetes = dict(self.en_tetes(i) if callable(self.en_tetes) else self.en_tetes)
+        if corps is not None:
+            corps = json.dumps(corps)
+            en_tetes["Content-Type"] = "application/json"
+        return chemin, corps, en_tetes
+
+
+# 🔹 Exécute `requetes` appels du scénario avec `concurrence` threads (connexions keep-alive)
+def charger(adresse, scenario, concurrence, requetes):
+    latences, erreurs = [], []
+    verrou = threading.Lock()
+    compteur = iter(range(requetes))
+
+    def client():
+        connexion = http.client.HTTPConnection(*adresse, timeout=30)
+        while True:
+            with verrou:
+                i = next(compteur, None)
+            if i is None:
+                break
+            chemin, corps, en_tetes = scenario.requete(i)
+            debut = time.perf_counter()
+            try:
+                connexion.request(scenario.methode, chemin, body=corps, headers=en_tetes)
+                reponse = connexion.getresponse()
+                reponse.read()
+                code = reponse.status
+            except (OSError, http.client.HTTPException) as e:
+                connexion.close()
+                connexion = http.client.HTTPConnection(*adresse, timeout=30)
+                code = str(e)
+            duree = time.perf_counter() - debut
+            with verrou:
+                latences.append(duree)
+                if not isinstance(code, int) or code >= 400:
+                    erreurs.append(code)
+
+    debut = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrence)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resumer(latences, time.perf_counter() - debut, erreurs)
+
+
+# 🔹 Même mesure en processus, via le client de test Django (un appel à la fois, sans réseau)
+def charger_client(client, scenario, requetes):
+    latences, erreurs = [], []
+    debut = time.perf_counter()
+    for i in range(requetes):
+        chemin, corps, en_tetes = scenario.requete(i)
+        debut_requete = time.perf_counter()
+        reponse = client.generic(
+            scenario.methode, chemin, corps or "",
+            content_type=en_tetes.pop("Content-Type", "application/octet-stream"), headers=en_tetes,
+        )
+        latences.append(time.perf_counter() - debut_requete)
+        if reponse.status_code >= 400:
+            erreurs.append(reponse.status_code)
+    return resumer(latences, time.perf_counter() - debut, erreurs)
+
+
+# 🔹 Commit mesuré (suffixe +modifs si l'arbre de travail diffère), pour comparer les runs entre commits
+def version_code():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=settings.BASE_DIR, capture_output=True, text=True).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "inconnu"
+    return commit + ("+modifs" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def resumer(latences, duree, erreurs=()):
+    if len(latences) < 2:
+        centiles = [latences[0]] * 99 if latences else [0.0] * 99
+    else:
+        centiles = statistics.quantiles(latences, n=100, method="inclusive")
+    return {
+        "requetes": len(latences),
+        "erreurs": len(erreurs),
+        "debit_rps": round(len(latences) / duree, 1) if duree else 0.0,
+        "p50_ms": round(centiles[49] * 1000, 2),
+        "p95_ms": round(centiles[94] * 1000, 2),
+        "p99_ms": round(centiles[98] * 1000, 2),
+    }
@@ -0,0 +1,118 @@
+import hashlib
+import uuid
+import weakref
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.http import parse_etags, quote_etag
+from .models import DemandeTransfert
+from .signals import statut_demande_change
+
+# 🏷️ Version de la file des demandes : jeton aléatoire partagé par les workers (cache Django),
+#    remplacé après chaque commit qui crée ou change une demande. Un jeton plutôt qu'un compteur :
+#    pas d'incrément atomique avec FileBasedCache, et un cache vidé ne ressert jamais une vieille page.
+#    Une version pour la file complète + une par réseau (couloirs /demandes_en_attente/<reseau>/) :
+#    l'appareil Orange reste en 304 quand seules des demandes MTN arrivent.
+def cle_version(reseau=None):
+    return f"demandes:version:{reseau}" if reseau else "demandes:version"
+
+
+def version_file(reseau=None):
+    cle = cle_version(reseau)
+    version = cache.get(cle)
+    if version is None:
+        cache.add(cle, uuid.uuid4().hex, None)
+        version = cache.get(cle)
+    return version
+
+
+async def aversion_file(reseau=None):
+    cle = cle_version(reseau)
+    version = await cache.aget(cle)
+    if version is None:
+        await cache.aadd(cle, uuid.uuid4().hex, None)
+        version = await cache.aget(cle)
+    return version
+
+
+def changer_version(*reseaux):
+    cache.set_many({cle_version(reseau): uuid.uuid4().hex for reseau in (None, *reseaux)}, None)
+
+
+# 🔹 Un seul changement de version par transaction, au commit, pour tous les réseaux touchés
+class ChangementVersion:
+    def __init__(self, savepoints):
+        self.savepoints = savepoints
+        self.reseaux = set()
+        self.execute = False
+
+    def __call__(self):
+        self.execute = True
+        changer_version(*self.reseaux)
+
+
+#    Drapeau par transaction : référence faible, sur la connexion, vers le rappel en attente.
+#    Un rollback (transaction ou savepoint) abandonne le rappel, la référence meurt et l'appel
+#    suivant en planifie un nouveau. Regroupé seulement au même niveau de savepoint.
+def planifier_changement_version(*reseaux):
+    connexion = transaction.get_connection()
+    savepoints = tuple(connexion.savepoint_ids)
+    reference = getattr(connexion, "changement_version", None)
+    changement = reference() if reference is not None else None
+    if changement is not None and not changement.execute and changement.savepoints == savepoints:
+        changement.reseaux.update(reseaux)
+        return
+
+    changement = ChangementVersion(savepoints)
+    changement.reseaux.update(reseaux)
+    if connexion.in_atomic_block:
+        connexion.changement_version = weakref.ref(changement)
+    transaction.on_commit(changement)
+
+
+# 📣 Seules les demandes en attente figurent dans la file : création ou modification via save()
+#    (vues, admin Django, shell), et changements de statut qui quittent 'en_attente'.
+#    Pas de post_delete : il empêcherait la suppression en masse de l'archivage, qui ne supprime
+#    que des demandes terminées (une suppression manuelle en attente reste servie au plus
+#    TRANSFERT_CACHE_LISTE_DUREE secondes).
+@receiver(post_save, sender=DemandeTransfert)
+def invalider_file(sender, instance, created, **kwargs):
+    if instance.statut == 'en_attente' or not created:
+        planifier_changement_version(instance.reseau)
+
+
+@receiver(statut_demande_change)
+def invalider_file_statut(sender, demande, ancien_statut, **kwargs):
+    if 'en_attente' in (ancien_statut, demande.statut):
+        planifier_changement_version(demande.reseau)
+
+
+# 📦 Page de la liste mise en cache pour une version et une query string donnée.
+#    La version est lue AVANT la requête SQL : une page calculée pendant un commit est
+#    rangée sous l'ancienne version, jamais servie comme à jour sous la nouvelle.
+class PageEnCache:
+    def __init__(self, request, version):
+        parametres = urlencode(sorted(request.GET.lists()), doseq=True)
+        empreinte = hashlib.blake2b(parametres.encode(), digest_size=8).hexdigest()
+        self.etag = quote_etag(f"{version}-{empreinte}")
+        self.cle = f"demandes:page:{version}:{empreinte}"
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        self.non_modifiee = self.etag in etags or "*" in etags
+
+    def en_tetes(self):
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def lire(self):
+        return cache.get(self.cle)
+
+    def ecrire(self, contenu):
+        cache.set(self.cle, contenu, settings.TRANSFERT_CACHE_LISTE_DUREE)
+
+    async def alire(self):
+        return await cache.aget(self.cle)
+
+    async def aecrire(self, contenu):
+        await cache.aset(self.cle, contenu, settings.TRANSFERT_CACHE_LISTE_DUREE)
@@ -0,0 +1,72 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import CumulJournalier, DemandeTransfert, DemandeTransfertArchive
+from .signals import demande_creee, statut_demande_change
+
+
+# 🔹 Incrément atomique (F()) de la ligne de cumul, créée au premier passage
+def ajuster_cumul(jour, reseau, methode_paiement, statut, nombre, montant):
+    ligne = CumulJournalier.objects.filter(
+        jour=jour, reseau=reseau, methode_paiement=methode_paiement, statut=statut
+    )
+    increment = {"nombre": F("nombre") + nombre, "montant_total": F("montant_total") + montant}
+    if ligne.update(**increment):
+        return
+
+    try:
+        with transaction.atomic():
+            CumulJournalier.objects.create(
+                jour=jour, reseau=reseau, methode_paiement=methode_paiement, statut=statut,
+                nombre=nombre, montant_total=montant
+            )
+    except IntegrityError:
+        # Créée entre-temps par une autre transaction
+        ligne.update(**increment)
+
+
+def _jour(demande):
+    return timezone.localdate(demande.date_creation)
+
+
+# 📣 Tenus dans la transaction de la vue : le cumul ne diverge jamais de la table
+@receiver(demande_creee)
+def cumuler_creation(sender, demande, **kwargs):
+    ajuster_cumul(_jour(demande), demande.reseau, demande.methode_paiement, demande.statut, 1, demande.montant)
+
+
+@receiver(statut_demande_change)
+def cumuler_changement_statut(sender, demande, ancien_statut, **kwargs):
+    if ancien_statut == demande.statut:
+        return
+    jour = _jour(demande)
+    ajuster_cumul(jour, demande.reseau, demande.methode_paiement, ancien_statut, -1, -demande.montant)
+    ajuster_cumul(jour, demande.reseau, demande.methode_paiement, demande.statut, 1, demande.montant)
+
+
+# 🔁 Reconstruction complète (backfill) depuis les demandes, dans une seule transaction
+def reconstruire_cumuls(sources=(DemandeTransfert, DemandeTransfertArchive)):
+    with transaction.atomic():
+        totaux = {}
+        for modele in sources:
+            lignes = (
+                modele.objects
+                .annotate(jour=TruncDate("date_creation"))
+                .values("jour", "reseau", "methode_paiement", "statut")
+                .annotate(nombre=Count("id"), montant_total=Sum("montant"))
+                .order_by()
+            )
+            for ligne in lignes:
+                cle = (ligne["jour"], ligne["reseau"], ligne["methode_paiement"], ligne["statut"])
+                nombre, montant = totaux.get(cle, (0, 0))
+                totaux[cle] = (nombre + ligne["nombre"], montant + ligne["montant_total"])
+
+        CumulJournalier.objects.all().delete()
+        CumulJournalier.objects.bulk_create([
+            CumulJournalier(jour=jour, reseau=reseau, methode_paiement=methode, statut=statut,
+                            nombre=nombre, montant_total=montant)
+            for (jour, reseau, methode, statut), (nombre, montant) in totaux.items()
+        ], batch_size=1000)
+    return len(totaux)
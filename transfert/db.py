@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+# 🗄️ Réglage de chaque nouvelle connexion SQLite : WAL (lecteurs non bloqués par l'écrivain),
+#    synchronous=NORMAL, busy_timeout et mmap
+@receiver(connection_created)
+def configurer_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+
+    for nom, valeur in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {nom} = {valeur}")
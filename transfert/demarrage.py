@@ -0,0 +1,42 @@
+import os
+import threading
+import time
+from django.db import connection
+from django.http import JsonResponse
+from django.urls import get_resolver
+from .cache_demandes import version_file
+
+# 🔥 Préchauffage des workers (gunicorn.conf.py) et état exposé par /pret/
+_etat = {"pret": False, "pid": None, "prechauffage_ms": None, "erreur": None}
+_verrou = threading.Lock()
+
+
+# 🔹 Imports (urlconf, vues, serializers, renderers) : dans le maître avant le fork avec preload_app,
+#    pour que chaque worker hérite des modules déjà chargés
+def charger_application():
+    get_resolver().url_patterns
+
+
+# 🔹 Par worker, après le fork : connexion base et cache (jamais partagées entre processus)
+def prechauffer():
+    with _verrou:
+        if _etat["pret"] and _etat["pid"] == os.getpid():
+            return dict(_etat)
+
+        debut = time.perf_counter()
+        try:
+            charger_application()
+            connection.ensure_connection()
+            version_file()
+        except Exception as e:
+            _etat.update(pret=False, erreur=str(e))
+        else:
+            _etat.update(pret=True, erreur=None)
+        _etat.update(pid=os.getpid(), prechauffage_ms=round((time.perf_counter() - debut) * 1000, 1))
+        return dict(_etat)
+
+
+# 🚦 Sonde de disponibilité : 200 une fois le worker préchauffé, 503 sinon (réessaie à chaque appel)
+def pret(request):
+    etat = prechauffer()
+    return JsonResponse(etat, status=200 if etat["pret"] else 503)
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from .signals import demande_creee, statut_demande_change
+
+
+class Evenement:
+    __slots__ = ("id", "numero", "type", "donnees")
+
+    def __init__(self, id, numero, type, donnees):
+        self.id = id  # "<pid>-<numero>", envoyé comme id SSE
+        self.numero = numero
+        self.type = type
+        self.donnees = donnees
+
+
+# 🔹 Abonnement d'un client (une connexion SSE) : file asyncio alimentée depuis n'importe quel thread
+class Abonnement:
+    def __init__(self, bus):
+        self.bus = bus
+        self.boucle = asyncio.get_running_loop()
+        self.file = asyncio.Queue()
+
+    def pousser(self, evenement):
+        try:
+            self.boucle.call_soon_threadsafe(self.file.put_nowait, evenement)
+        except RuntimeError:
+            # Boucle fermée : le client est parti
+            self.bus.desabonner(self)
+
+    async def suivant(self, timeout):
+        try:
+            return await asyncio.wait_for(self.file.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# 📡 Pub/sub en mémoire du processus, avec historique pour la reprise (Last-Event-ID).
+#    ⚠️ Un abonné ne reçoit que les événements de SON worker : le flux SSE suppose un seul worker
+#    (WEB_CONCURRENCY=1), ou un bus inter-processus branché via settings.TRANSFERT_BUS_EVENEMENTS
+#    (même interface). Les ids portent le pid : une reprise arrivée sur un autre worker
+#    reçoit "resync" au lieu d'événements qui ne la concernent pas.
+class BusEnMemoire:
+    def __init__(self, taille_historique=None):
+        self._verrou = threading.Lock()
+        self._historique = deque(maxlen=taille_historique or settings.TRANSFERT_SSE_HISTORIQUE)
+        self._abonnes = set()
+        self.pid = os.getpid()
+        # Numéros croissants même après un redémarrage du processus
+        self._dernier_id = int(time.time() * 1000)
+
+    def publier(self, type, donnees):
+        with self._verrou:
+            self._dernier_id += 1
+            evenement = Evenement(f"{self.pid}-{self._dernier_id}", self._dernier_id, type, donnees)
+            self._historique.append(evenement)
+            abonnes = list(self._abonnes)
+
+        for abonnement in abonnes:
+            abonnement.pousser(evenement)
+        return evenement
+
+    # 🔹 Retourne (abonnement, événements à rejouer) ; rejouer=None si la reprise est impossible
+    #    (id d'un autre processus, ou plus dans l'historique). ValueError si l'id est mal formé.
+    def abonner(self, dernier_id=None):
+        if dernier_id is not None:
+            pid, _, numero = dernier_id.rpartition("-")
+            numero = int(numero)
+
+        abonnement = Abonnement(self)
+        with self._verrou:
+            self._abonnes.add(abonnement)
+            if dernier_id is None:
+                return abonnement, []
+
+            if pid != str(self.pid) or numero > self._dernier_id or (
+                self._historique and numero < self._historique[0].numero - 1
+            ):
+                return abonnement, None
+            return abonnement, [e for e in self._historique if e.numero > numero]
+
+    def desabonner(self, abonnement):
+        with self._verrou:
+            self._abonnes.discard(abonnement)
+
+
+_bus = None
+_verrou_bus = threading.Lock()
+
+
+def obtenir_bus():
+    global _bus
+    if _bus is None or getattr(_bus, "pid", None) not in (None, os.getpid()):
+        with _verrou_bus:
+            # Bus créé avant un fork : chaque worker a le sien (ids et abonnés propres)
+            if _bus is None or getattr(_bus, "pid", None) not in (None, os.getpid()):
+                _bus = import_string(settings.TRANSFERT_BUS_EVENEMENTS)()
+    return _bus
+
+
+# 🔔 Publication après commit des créations et changements de statut
+TYPES_STATUT = {'valide': 'validated', 'echec': 'failed'}
+
+
+@receiver(demande_creee)
+def publier_creation(sender, demande, **kwargs):
+    donnees = {
+        "id": demande.id,
+        "reseau": demande.reseau,
+        "montant": str(demande.montant),
+        "numero_destinataire": demande.numero_destinataire,
+        "methode_paiement": demande.methode_paiement,
+        "statut": demande.statut,
+        "date_creation": demande.date_creation.isoformat(),
+    }
+    transaction.on_commit(lambda: obtenir_bus().publier("created", donnees))
+
+
+@receiver(statut_demande_change)
+def publier_changement_statut(sender, demande, ancien_statut, operateur=None, **kwargs):
+    type = TYPES_STATUT.get(demande.statut)
+    if type is None:
+        return
+
+    donnees = {
+        "id": demande.id,
+        "statut": demande.statut,
+        "ancien_statut": ancien_statut,
+        "code_ussd": demande.code_ussd,
+        "operateur": operateur,
+    }
+    transaction.on_commit(lambda: obtenir_bus().publier(type, donnees))
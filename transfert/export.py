@@ -0,0 +1,121 @@
+import csv
+import json
+import zlib
+from datetime import datetime, time, timedelta
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import DemandeTransfert, DemandeTransfertArchive
+
+COLONNES = (
+    'id', 'utilisateur_id', 'numero_destinataire', 'reseau', 'montant', 'numero_wave',
+    'methode_paiement', 'statut', 'date_creation', 'code_ussd',
+)
+TAILLE_MORCEAU = 64 * 1024
+
+
+class FiltreInvalide(ValueError):
+    pass
+
+
+def _debut_jour(valeur, nom):
+    jour = parse_date(valeur) if len(valeur) == 10 else None
+    if jour is None:
+        raise FiltreInvalide(f"{nom} invalide (AAAA-MM-JJ).")
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+# 🔹 Filtres communs (bornes de date en datetime pour rester sur l'index date_creation)
+def construire_filtres(date_debut=None, date_fin=None, reseau=None, statut=None):
+    filtres = {}
+    if date_debut:
+        filtres['date_creation__gte'] = _debut_jour(date_debut, "date_debut")
+    if date_fin:
+        filtres['date_creation__lt'] = _debut_jour(date_fin, "date_fin") + timedelta(days=1)
+    if reseau:
+        filtres['reseau'] = reseau.lower()
+    if statut:
+        filtres['statut'] = statut
+    return filtres
+
+
+# 🔹 Tuples lus par paquets (curseur serveur sur PostgreSQL) : table chaude puis archive
+def lignes_demandes(filtres, taille_lot=2000):
+    for modele in (DemandeTransfert, DemandeTransfertArchive):
+        yield from modele.objects.filter(**filtres).order_by('id').values_list(*COLONNES).iterator(chunk_size=taille_lot)
+
+
+def _valeur(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if v is None or isinstance(v, (int, str)):
+        return v
+    return str(v)
+
+
+class _Tampon:
+    def write(self, valeur):
+        return valeur
+
+
+def _regrouper(textes):
+    morceau, taille = [], 0
+    for texte in textes:
+        morceau.append(texte)
+        taille += len(texte)
+        if taille >= TAILLE_MORCEAU:
+            yield "".join(morceau).encode()
+            morceau, taille = [], 0
+    if morceau:
+        yield "".join(morceau).encode()
+
+
+def formater_csv(lignes):
+    ecrivain = csv.writer(_Tampon())
+
+    def textes():
+        yield ecrivain.writerow(COLONNES)
+        for ligne in lignes:
+            yield ecrivain.writerow([_valeur(v) for v in ligne])
+    return _regrouper(textes())
+
+
+def formater_ndjson(lignes):
+    return _regrouper(
+        json.dumps(dict(zip(COLONNES, map(_valeur, ligne))), ensure_ascii=False) + "\n" for ligne in lignes
+    )
+
+
+def compresser_gzip(morceaux):
+    compresseur = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for morceau in morceaux:
+        sortie = compresseur.compress(morceau)
+        if sortie:
+            yield sortie
+    yield compresseur.flush()
+
+
+FORMATS = {
+    'csv': (formater_csv, 'text/csv'),
+    'ndjson': (formater_ndjson, 'application/x-ndjson'),
+}
+
+
+# 📤 Flux d'octets de l'export ; mémoire constante quel que soit le nombre de lignes
+def exporter(type_fichier, filtres, gzip=False, taille_lot=2000):
+    formater, _ = FORMATS[type_fichier]
+    morceaux = formater(lignes_demandes(filtres, taille_lot))
+    return compresser_gzip(morceaux) if gzip else morceaux
+
+
+# 🔹 Sous ASGI, StreamingHttpResponse consomme un itérateur synchrone avec list() : tout l'export
+#    en mémoire. Ici chaque morceau est produit à la demande dans le thread de la requête.
+async def exporter_async(morceaux):
+    suivant = sync_to_async(next)
+    fin = object()
+    try:
+        while (morceau := await suivant(morceaux, fin)) is not fin:
+            yield morceau
+    finally:
+        # Client parti en cours de route : curseur refermé dans le même thread
+        await sync_to_async(morceaux.close)()
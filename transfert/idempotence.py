@@ -0,0 +1,98 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import CleIdempotence
+
+
+class ConflitIdempotence(Exception):
+    pass
+
+
+# ⚡ LRU en mémoire (par processus) des réponses déjà stockées, avec TTL
+class CacheReponses:
+    def __init__(self, taille, duree):
+        self.taille = taille
+        self.duree = duree
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def lire(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return None
+            if entree[0] < time.monotonic():
+                del self._entrees[cle]
+                return None
+            self._entrees.move_to_end(cle)
+            return entree[1]
+
+    def ecrire(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = (time.monotonic() + self.duree, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+
+cache_reponses = CacheReponses(settings.TRANSFERT_IDEMPOTENCE_CACHE_TAILLE, settings.TRANSFERT_IDEMPOTENCE_DUREE)
+
+
+def calculer_empreinte(champs):
+    return hashlib.sha256(json.dumps(champs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _verifier(empreinte, stockee):
+    if stockee[0] != empreinte:
+        raise ConflitIdempotence("Idempotency-Key déjà utilisée avec une autre requête.")
+    return stockee[1], stockee[2]
+
+
+# 🔹 Exécute `fonction` (→ code_http, reponse) une seule fois par (utilisateur, clé).
+#    La clé est insérée avant l'écriture métier, dans la même transaction : un doublon
+#    concurrent attend sur la contrainte unique puis relit la réponse stockée.
+#    Retourne (code_http, reponse, rejouee).
+def executer_idempotent(utilisateur, cle, empreinte, fonction):
+    cle_cache = (utilisateur.id, cle)
+    stockee = cache_reponses.lire(cle_cache)
+    if stockee:
+        return (*_verifier(empreinte, stockee), True)
+
+    limite = timezone.now() - timedelta(seconds=settings.TRANSFERT_IDEMPOTENCE_DUREE)
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                enregistrement = CleIdempotence.objects.create(utilisateur=utilisateur, cle=cle, empreinte=empreinte)
+        except IntegrityError:
+            enregistrement = CleIdempotence.objects.get(utilisateur=utilisateur, cle=cle)
+            if enregistrement.date_creation >= limite:
+                stockee = (enregistrement.empreinte, enregistrement.code_http, enregistrement.reponse)
+                cache_reponses.ecrire(cle_cache, stockee)
+                return (*_verifier(empreinte, stockee), True)
+
+            # ⌛ Clé expirée : réutilisée comme une nouvelle requête
+            enregistrement.empreinte = empreinte
+            enregistrement.date_creation = timezone.now()
+
+        code_http, reponse = fonction()
+        enregistrement.code_http = code_http
+        enregistrement.reponse = reponse
+        enregistrement.save()
+
+    cache_reponses.ecrire(cle_cache, (empreinte, code_http, reponse))
+    return code_http, reponse, False
+
+
+def purger_cles_expirees():
+    limite = timezone.now() - timedelta(seconds=settings.TRANSFERT_IDEMPOTENCE_DUREE)
+    return CleIdempotence.objects.filter(date_creation__lt=limite).delete()[0]
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import time
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from .models import Utilisateur
+
+
+class InscriptionInvalide(ValueError):
+    pass
+
+
+# 🔹 Règles d'inscription (InscriptionView, import en masse) ; retourne les champs nettoyés
+def valider_inscription(data):
+    nom_complet = data.get('nom_complet')
+    numero = data.get('numero')
+    pin = data.get('pin')
+    confirmation_pin = data.get('confirmation_pin')
+
+    if not nom_complet or not numero or not pin or not confirmation_pin:
+        raise InscriptionInvalide("Tous les champs sont requis.")
+
+    if not isinstance(pin, str) or not pin.isdigit():
+        raise InscriptionInvalide("Le code PIN doit contenir uniquement des chiffres.")
+
+    if len(pin) != 4:
+        raise InscriptionInvalide("Le code PIN doit contenir exactement 4 chiffres.")
+
+    if pin != confirmation_pin:
+        raise InscriptionInvalide("Les deux codes PIN ne correspondent pas.")
+
+    numero = str(numero).strip()
+    if len(numero) > Utilisateur._meta.get_field('numero').max_length:
+        raise InscriptionInvalide("Numéro invalide.")
+
+    return {"nom_complet": nom_complet, "numero": numero, "pin": pin}
+
+
+# 📥 Lecture d'un fichier d'import (texte) : une ligne = {nom_complet, numero, pin[, confirmation_pin]}
+def lire_csv(flux):
+    yield from csv.DictReader(flux)
+
+
+def lire_ndjson(flux):
+    for ligne in flux:
+        if ligne.strip():
+            try:
+                yield json.loads(ligne)
+            except ValueError:
+                yield {}
+
+
+LECTEURS = {"csv": lire_csv, "ndjson": lire_ndjson}
+
+
+def lire_fichier(contenu, type):
+    if isinstance(contenu, bytes):
+        contenu = contenu.decode("utf-8-sig")
+    return LECTEURS[type](io.StringIO(contenu) if isinstance(contenu, str) else contenu)
+
+
+# 🔹 Initialisation des processus de hachage (nécessaire hors fork : spawn / forkserver)
+def initialiser_processus():
+    import django
+
+    django.setup()
+
+
+class ResultatImport:
+    def __init__(self):
+        self.crees = 0
+        self.deja_inscrits = []
+        self.invalides = []
+        self.duree = 0.0
+
+    @property
+    def debit(self):
+        return self.crees / self.duree if self.duree else 0.0
+
+    def en_dict(self):
+        return {
+            "crees": self.crees,
+            "deja_inscrits": self.deja_inscrits,
+            "invalides": self.invalides,
+            "utilisateurs_par_seconde": round(self.debit, 1),
+        }
+
+
+def _par_lots(lignes, taille_lot):
+    lot = []
+    for numero_ligne, ligne in enumerate(lignes, start=1):
+        lot.append((numero_ligne, ligne))
+        if len(lot) == taille_lot:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+# 👥 Import en masse, par lots : mêmes règles que l'inscription, une requête numero__in par lot,
+#    hachage des PIN réparti sur `executeur` (pool de processus ou de threads), puis bulk_create.
+#    Sans confirmation_pin dans le fichier, le PIN vaut confirmation.
+def importer_utilisateurs(lignes, executeur, taille_lot=500):
+    resultat = ResultatImport()
+    vus = set()
+    debut = time.perf_counter()
+
+    for lot in _par_lots(lignes, taille_lot):
+        valides = {}
+        for numero_ligne, ligne in lot:
+            if not isinstance(ligne, dict):
+                ligne = {}
+            ligne = {**ligne, "confirmation_pin": ligne.get("confirmation_pin") or ligne.get("pin")}
+            try:
+                champs = valider_inscription(ligne)
+            except InscriptionInvalide as e:
+                resultat.invalides.append({"ligne": numero_ligne, "numero": ligne.get("numero"), "error": str(e)})
+                continue
+            if champs["numero"] in vus or champs["numero"] in valides:
+                resultat.deja_inscrits.append(champs["numero"])
+                continue
+            valides[champs["numero"]] = champs
+        vus.update(valides)
+
+        existants = set(Utilisateur.objects.filter(numero__in=list(valides)).values_list("numero", flat=True))
+        resultat.deja_inscrits.extend(sorted(existants))
+        a_creer = [champs for numero, champs in valides.items() if numero not in existants]
+        if not a_creer:
+            continue
+
+        hachages = executeur.map(make_password, [c["pin"] for c in a_creer], chunksize=max(1, len(a_creer) // 32))
+        utilisateurs = [
+            Utilisateur(nom_complet=c["nom_complet"], numero=c["numero"], code_pin=hachage)
+            for c, hachage in zip(a_creer, hachages)
+        ]
+        resultat.crees += _inserer(utilisateurs, resultat)
+
+    resultat.duree = time.perf_counter() - debut
+    return resultat
+
+
+def _inserer(utilisateurs, resultat):
+    try:
+        with transaction.atomic():
+            Utilisateur.objects.bulk_create(utilisateurs)
+        return len(utilisateurs)
+    except IntegrityError:
+        # 🏁 Numéro inscrit entre-temps par /api/inscription/ : on écarte les nouveaux existants
+        existants = set(Utilisateur.objects.filter(numero__in=[u.numero for u in utilisateurs]).values_list("numero", flat=True))
+        resultat.deja_inscrits.extend(sorted(existants))
+        restants = [u for u in utilisateurs if u.numero not in existants]
+        with transaction.atomic():
+            Utilisateur.objects.bulk_create(restants)
+        return len(restants)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...archives import archiver_demandes
+
+
+class Command(BaseCommand):
+    help = "Déplace les demandes valide/echec plus anciennes que --jours vers la table d'archive, par lots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jours', type=int, default=settings.TRANSFERT_ARCHIVE_APRES_JOURS)
+        parser.add_argument('--lot', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.05, help="Pause (s) entre deux lots.")
+
+    def handle(self, *args, **options):
+        total = archiver_demandes(options['jours'], options['lot'], options['pause'])
+        self.stdout.write(f"{total} demande(s) archivée(s).")
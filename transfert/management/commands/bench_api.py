@@ -0,0 +1,162 @@
+import json
+import os
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+from django.core.management.base import BaseCommand
+from ...bench import environnement, manage, preparer_base, serveur, charger, charger_client, version_code, Scenario
+from ...models import Utilisateur, DemandeTransfert
+
+CIBLES = ("client", "sync", "async")
+
+
+class Command(BaseCommand):
+    help = (
+        "Charge chaque route principale (inscription, connexion, deverrouillage, transfert, demandes_en_attente, "
+        "valider) sur une base SQLite jetable peuplée par generer_donnees : en processus via le client de test "
+        "Django, puis contre gunicorn (sync / async). Firebase n'est jamais appelé (outbox, clé inexistante). "
+        "Écrit p50/p95/p99 et débit par route dans un JSON daté du commit, comparable avec --comparer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cibles', nargs='+', choices=CIBLES, default=list(CIBLES))
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrence', type=int, default=8)
+        parser.add_argument('--requetes', type=int, default=300, help="Requêtes par route.")
+        parser.add_argument('--requetes-pin', type=int, default=30,
+                            help="Requêtes pour les routes qui hachent un PIN (PBKDF2, ~0,3 s chacune).")
+        parser.add_argument('--utilisateurs', type=int, default=1000)
+        parser.add_argument('--demandes', type=int, default=10000)
+        parser.add_argument('--sortie', help="Fichier JSON des résultats (défaut : bench-api-<commit>.json).")
+        parser.add_argument('--comparer', help="JSON d'un run précédent : affiche les écarts.")
+        parser.add_argument('--interne', choices=["donnees", "client"], help="Réservé : sous-processus du harnais.")
+
+    # 🔹 Utilisateurs peuplés (id, numéro) et demandes en attente, les plus anciennes d'abord
+    def donnees(self, options):
+        return {
+            "utilisateurs": list(
+                Utilisateur.objects.filter(numero__startswith="06").order_by("id").values_list("id", "numero")
+                [:options['utilisateurs']]
+            ),
+            "en_attente": list(
+                DemandeTransfert.objects.filter(statut="en_attente").order_by("date_creation", "id")
+                .values_list("id", flat=True)[:options['requetes']]
+            ),
+        }
+
+    def scenarios(self, donnees, options):
+        utilisateurs, en_attente = donnees["utilisateurs"], donnees["en_attente"]
+
+        # Une IP et un compte différents par essai de PIN : on mesure le chemin nominal, pas les seaux.
+        # Le harnais tient le rôle du proxy (NUM_PROXIES=1) : il fournit l'unique entrée X-Forwarded-For.
+        # deverrouillage vise d'autres comptes que connexion (sinon le cache des PIN vérifiés évite le hachage).
+        decalage = options['requetes_pin']
+
+        def ip(i):
+            return {"X-Forwarded-For": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"}
+
+        return [
+            (Scenario("inscription", "POST", "/api/inscription/", lambda i: {
+                "nom_complet": "Bench", "numero": f"05{i:08d}", "pin": "1234", "confirmation_pin": "1234",
+            }, ip), options['requetes_pin']),
+            (Scenario("connexion", "POST", "/api/connexion/", lambda i: {
+                "numero": utilisateurs[i % len(utilisateurs)][1], "pin": "1234",
+            }, ip), options['requetes_pin']),
+            (Scenario("deverrouillage", "POST", "/api/deverrouillage/", lambda i: {
+                "id_utilisateur": utilisateurs[(i + decalage) % len(utilisateurs)][0], "pin": "1234",
+            }, ip), options['requetes_pin']),
+            (Scenario("transfert", "POST", "/api/transfert/", lambda i: {
+                "id_utilisateur": utilisateurs[i % len(utilisateurs)][0],
+                "numero_destinataire": "0101010101",
+                "reseau": "orange",
+                "montant": 1000,
+                "numero_wave": "0707070707",
+                "methode_paiement": "wave",
+            }), options['requetes']),
+            (Scenario("demandes_en_attente", "GET", "/api/demandes_en_attente/"), options['requetes']),
+            (Scenario("valider", "POST", "/api/valider/", lambda i: {
+                "id_demande": en_attente[i % len(en_attente)], "code_ussd": "*144#",
+            }), min(options['requetes'], len(en_attente))),
+        ]
+
+    def mesurer_client(self, options):
+        from django.test import Client
+        from ...views import fcm_utils
+
+        client = Client()
+        with mock.patch.object(fcm_utils, "obtenir_app_firebase", side_effect=AssertionError("Firebase appelé")):
+            return {
+                scenario.nom: charger_client(client, scenario, requetes)
+                for scenario, requetes in self.scenarios(self.donnees(options), options)
+            }
+
+    def options_sous_processus(self, options):
+        return [
+            "--requetes", str(options['requetes']), "--requetes-pin", str(options['requetes_pin']),
+            "--utilisateurs", str(options['utilisateurs']),
+        ]
+
+    def mesurer(self, cible, options):
+        with tempfile.TemporaryDirectory() as dossier:
+            env = environnement(
+                Path(dossier) / "bench.sqlite3", CACHE_DOSSIER=str(Path(dossier) / "cache"),
+                METRIQUES_DOSSIER=dossier, GOOGLE_APPLICATION_CREDENTIALS=str(Path(dossier) / "absente.json"),
+                NUM_PROXIES="1",
+            )
+            preparer_base(env)
+            manage(env, "generer_donnees", "--utilisateurs", str(options['utilisateurs']),
+                   "--demandes", str(options['demandes']))
+            if cible == "client":
+                sortie = manage(env, "bench_api", "--interne", "client", *self.options_sous_processus(options))
+                return json.loads(sortie.strip().splitlines()[-1])
+
+            sortie = manage(env, "bench_api", "--interne", "donnees", *self.options_sous_processus(options))
+            donnees = json.loads(sortie.strip().splitlines()[-1])
+            with serveur(cible, options['workers'], env) as adresse:
+                return {
+                    scenario.nom: charger(adresse, scenario, options['concurrence'], requetes)
+                    for scenario, requetes in self.scenarios(donnees, options)
+                }
+
+    def handle(self, *args, **options):
+        if options['interne'] == "donnees":
+            self.stdout.write(json.dumps(self.donnees(options)))
+            return
+        if options['interne'] == "client":
+            self.stdout.write(json.dumps(self.mesurer_client(options)))
+            return
+
+        commit = version_code()
+        resultats = {
+            "commit": commit,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "machine": {"cpu": os.cpu_count(), "python": platform.python_version()},
+            "parametres": {cle: options[cle] for cle in (
+                "workers", "concurrence", "requetes", "requetes_pin", "utilisateurs", "demandes",
+            )},
+            "cibles": {},
+        }
+        for cible in options['cibles']:
+            self.stdout.write(f"⏳ {cible}…")
+            resultats["cibles"][cible] = self.mesurer(cible, options)
+
+        precedents = json.loads(Path(options['comparer']).read_text())["cibles"] if options['comparer'] else {}
+        self.stdout.write(
+            f"{'route':<22}{'cible':<8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erreurs':>9}"
+            + (f"{'Δ req/s':>10}{'Δ p95':>9}" if precedents else "")
+        )
+        for cible, mesures in resultats["cibles"].items():
+            for nom, m in mesures.items():
+                ligne = (f"{nom:<22}{cible:<8}{m['debit_rps']:>9}{m['p50_ms']:>9}{m['p95_ms']:>9}"
+                         f"{m['p99_ms']:>9}{m['erreurs']:>9}")
+                ancien = precedents.get(cible, {}).get(nom)
+                if ancien and ancien['debit_rps'] and ancien['p95_ms']:
+                    ligne += (f"{m['debit_rps'] / ancien['debit_rps'] - 1:>+10.0%}"
+                              f"{m['p95_ms'] / ancien['p95_ms'] - 1:>+9.0%}")
+                self.stdout.write(ligne)
+
+        sortie = Path(options['sortie'] or f"bench-api-{commit}.json")
+        sortie.write_text(json.dumps(resultats, indent=2))
+        self.stdout.write(f"Résultats écrits dans {sortie}")
@@ -0,0 +1,57 @@
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from transfert.models import Utilisateur, DemandeTransfert
+from transfert.renderers import JSONRapideRenderer
+from transfert.serializers import DemandeTransfertSerializer, CHAMPS_DEMANDE
+
+
+class Command(BaseCommand):
+    help = ("Compare le débit (lignes/s) de la liste des demandes : serializer DRF + JSONRenderer "
+            "contre .values() + JSONRapideRenderer. Les lignes de test sont annulées à la fin.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tailles', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repetitions', type=int, default=3)
+
+    def mesurer(self, fonction, repetitions):
+        meilleur = None
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction()
+            duree = time.perf_counter() - debut
+            meilleur = duree if meilleur is None else min(meilleur, duree)
+        return meilleur
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            utilisateur = Utilisateur.objects.create(nom_complet="Bench lecture", numero="bench-lecture", code_pin="!")
+            queryset = DemandeTransfert.objects.filter(utilisateur=utilisateur).order_by('-date_creation', '-id')
+            existantes = 0
+
+            for taille in sorted(options['tailles']):
+                DemandeTransfert.objects.bulk_create(
+                    (DemandeTransfert(
+                        utilisateur=utilisateur, numero_destinataire="0700000000", reseau="orange",
+                        montant=Decimal("1000.00") + i % 100, numero_wave="0500000000", methode_paiement="wave",
+                    ) for i in range(taille - existantes)),
+                    batch_size=2000,
+                )
+                existantes = taille
+
+                serializer = self.mesurer(
+                    lambda: JSONRenderer().render(DemandeTransfertSerializer(list(queryset.all()), many=True).data),
+                    options['repetitions'],
+                )
+                rapide = self.mesurer(
+                    lambda: JSONRapideRenderer().render(list(queryset.values(*CHAMPS_DEMANDE))),
+                    options['repetitions'],
+                )
+                self.stdout.write(
+                    f"{taille:>7} lignes  serializer {taille / serializer:>10,.0f} l/s  "
+                    f"values+orjson {taille / rapide:>10,.0f} l/s  x{serializer / rapide:.1f}"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = "Mesure le surcoût de MetriquesMiddleware (requêtes via le client de test, avec et sans)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requetes', type=int, default=2000)
+        parser.add_argument('--routes', nargs='+', default=['/ping/', '/api/demandes_en_attente/?limit=20'])
+
+    def mesurer(self, route, requetes):
+        client = Client()
+        client.get(route)
+        debut = time.perf_counter()
+        for _ in range(requetes):
+            client.get(route)
+        return (time.perf_counter() - debut) / requetes
+
+    def handle(self, *args, **options):
+        sans_metriques = [m for m in settings.MIDDLEWARE if m != 'transfert.metriques.MetriquesMiddleware']
+
+        for route in options['routes']:
+            with override_settings(MIDDLEWARE=sans_metriques):
+                reference = self.mesurer(route, options['requetes'])
+            avec = self.mesurer(route, options['requetes'])
+            self.stdout.write(
+                f"{route:<40} sans {reference * 1e6:8.1f} µs  avec {avec * 1e6:8.1f} µs  "
+                f"surcoût {(avec - reference) / reference * 100:+.1f} %"
+            )
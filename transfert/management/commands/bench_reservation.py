@@ -0,0 +1,93 @@
+import http.client
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand
+from transfert.bench import environnement, manage, preparer_base, serveur
+
+JETON_CSRF = "bench" * 6 + "ok"
+
+
+class Command(BaseCommand):
+    help = ("Vide une file de demandes avec N opérateurs en parallèle (reserver → exécution USSD simulée → "
+            "valider_lot) contre gunicorn, et vérifie qu'aucune demande n'est traitée deux fois.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operateurs', type=int, nargs='+', default=[1, 2, 4, 8])
+        parser.add_argument('--demandes', type=int, default=400)
+        parser.add_argument('--lot', type=int, default=10)
+        parser.add_argument('--traitement', type=float, default=0.02, help="Durée simulée (s) d'un code USSD.")
+
+    # 🔹 Un compte admin par opérateur (l'opérateur d'une réservation est le compte authentifié),
+    #    connecté par session : pas de hachage de mot de passe à chaque appel comme en Basic
+    def operateur(self, adresse, nom, session, options, traitees, refus):
+        connexion = http.client.HTTPConnection(*adresse, timeout=30)
+        en_tetes = {
+            "Content-Type": "application/json",
+            "Cookie": f"sessionid={session}; csrftoken={JETON_CSRF}",
+            "X-CSRFToken": JETON_CSRF,
+        }
+
+        def appeler(chemin, corps):
+            connexion.request("POST", chemin, body=json.dumps(corps), headers=en_tetes)
+            return json.loads(connexion.getresponse().read())
+
+        while True:
+            demandes = appeler("/api/reserver/", {"nombre": options['lot']})["demandes"]
+            if not demandes:
+                return
+            time.sleep(options['traitement'] * len(demandes))
+            resultats = appeler("/api/valider_lot/", {
+                "demandes": [{"id_demande": d["id"], "code_ussd": "*144#"} for d in demandes],
+            })["resultats"]
+            traitees.extend(r["id_demande"] for r in resultats if r["resultat"] == "valide")
+            refus.extend(r for r in resultats if r["resultat"] != "valide")
+
+    def handle(self, *args, **options):
+        reference = None
+        for nombre in options['operateurs']:
+            with tempfile.TemporaryDirectory() as dossier:
+                env = environnement(
+                    Path(dossier) / "reservation.sqlite3", CACHE_DOSSIER=str(Path(dossier) / "cache"),
+                    METRIQUES_DOSSIER=dossier,
+                )
+                id_utilisateur = preparer_base(env)
+                manage(env, "shell", "-c", (
+                    "from transfert.models import DemandeTransfert\n"
+                    f"DemandeTransfert.objects.bulk_create([DemandeTransfert(utilisateur_id={id_utilisateur}, "
+                    "numero_destinataire='0101010101', reseau='orange', montant=1000, numero_wave='0707070707', "
+                    f"methode_paiement='wave') for _ in range({options['demandes']})])"
+                ))
+                sessions = json.loads(manage(env, "shell", "-c", (
+                    "import json\n"
+                    "from django.contrib.auth.models import User\n"
+                    "from django.test import Client\n"
+                    "sessions = {}\n"
+                    f"for i in range({nombre}):\n"
+                    "    client = Client()\n"
+                    "    client.force_login(User.objects.create(username=f'op{i}', is_staff=True))\n"
+                    "    sessions[f'op{i}'] = client.cookies['sessionid'].value\n"
+                    "print(json.dumps(sessions))"
+                )).strip().splitlines()[-1])
+
+                traitees, refus = [], []
+                with serveur("sync", nombre + 1, env) as adresse:
+                    debut = time.perf_counter()
+                    threads = [
+                        threading.Thread(target=self.operateur, args=(adresse, nom, session, options, traitees, refus))
+                        for nom, session in sessions.items()
+                    ]
+                    for t in threads:
+                        t.start()
+                    for t in threads:
+                        t.join()
+                    duree = time.perf_counter() - debut
+
+            debit = len(traitees) / duree
+            reference = reference or debit
+            self.stdout.write(
+                f"{nombre:>2} opérateur(s) : {len(traitees)} traitées en {duree:.2f} s, {debit:7.1f} demandes/s "
+                f"(x{debit / reference:.2f}), doublons {len(traitees) - len(set(traitees))}, refus {len(refus)}"
+            )
@@ -0,0 +1,75 @@
+import json
+import tempfile
+from pathlib import Path
+from django.core.management.base import BaseCommand
+from ...bench import environnement, manage, preparer_base, serveur, charger, Scenario
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le mode sync (gunicorn backendorhelo.wsgi) et le mode async "
+        "(uvicorn worker + TRANSFERT_VUES_ASYNC=1) à nombre de workers égal, sur une base SQLite jetable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrence', type=int, default=16)
+        parser.add_argument('--requetes', type=int, default=500, help="Requêtes par scénario.")
+        parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats.")
+
+    # 🔹 deverrouillage : une IP et un compte différents par appel (ni seaux PinThrottle ni cache des PIN
+    #    vérifiés) ; le harnais tient le rôle du proxy (NUM_PROXIES=1) et fournit X-Forwarded-For.
+    def scenarios(self, id_utilisateur, comptes):
+        def ip(i):
+            return {"X-Forwarded-For": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"}
+
+        return [
+            Scenario("deverrouillage", "POST", "/api/deverrouillage/", lambda i: {
+                "id_utilisateur": comptes[i % len(comptes)], "pin": "1234",
+            }, ip),
+            Scenario("transfert", "POST", "/api/transfert/", {
+                "id_utilisateur": id_utilisateur,
+                "numero_destinataire": "0101010101",
+                "reseau": "orange",
+                "montant": 1000,
+                "numero_wave": "0707070707",
+                "methode_paiement": "wave",
+            }),
+            Scenario("demandes_en_attente", "GET", "/api/demandes_en_attente/"),
+            Scenario("valider", "POST", "/api/valider/", lambda i: {"id_demande": i + 1, "code_ussd": "*144#"}),
+        ]
+
+    def handle(self, *args, **options):
+        resultats = {"workers": options['workers'], "concurrence": options['concurrence'], "modes": {}}
+
+        for mode in ("sync", "async"):
+            with tempfile.TemporaryDirectory() as dossier:
+                env = environnement(
+                    Path(dossier) / "bench.sqlite3", CACHE_DOSSIER=str(Path(dossier) / "cache"),
+                    METRIQUES_DOSSIER=dossier, NUM_PROXIES="1",
+                )
+                id_utilisateur = preparer_base(env)
+                manage(env, "generer_donnees", "--utilisateurs", str(options['requetes']), "--demandes", "0")
+                comptes = json.loads(manage(env, "shell", "-c", (
+                    "import json\n"
+                    "from transfert.models import Utilisateur\n"
+                    "print(json.dumps(list(Utilisateur.objects.filter(numero__startswith='06')"
+                    ".values_list('id', flat=True))))"
+                )).strip().splitlines()[-1])
+
+                with serveur(mode, options['workers'], env) as adresse:
+                    resultats["modes"][mode] = {
+                        scenario.nom: charger(adresse, scenario, options['concurrence'], options['requetes'])
+                        for scenario in self.scenarios(id_utilisateur, comptes)
+                    }
+
+        self.stdout.write(f"{'scénario':<22}{'mode':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erreurs':>9}")
+        for nom in resultats["modes"]["sync"]:
+            for mode, mesures in resultats["modes"].items():
+                m = mesures[nom]
+                self.stdout.write(
+                    f"{nom:<22}{mode:<7}{m['debit_rps']:>9}{m['p50_ms']:>9}{m['p95_ms']:>9}{m['p99_ms']:>9}{m['erreurs']:>9}"
+                )
+
+        if options['sortie']:
+            Path(options['sortie']).write_text(json.dumps(resultats, indent=2))
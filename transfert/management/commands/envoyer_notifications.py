@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ...outbox import vider_en_boucle
+
+
+class Command(BaseCommand):
+    help = (
+        "Vide l'outbox des notifications admin vers Firebase (send_each, retry avec backoff). "
+        "Lancer un seul processus worker (base partagée, DATABASE_URL) ; sous SQLite les workers web s'en chargent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--une-fois', action='store_true', help="Traite les notifications dues puis s'arrête.")
+        parser.add_argument('--intervalle', type=float, default=2.0, help="Pause (s) quand l'outbox est vide.")
+        parser.add_argument('--taille-lot', type=int, default=None)
+
+    def handle(self, *args, **options):
+        vider_en_boucle(options['intervalle'], options['taille_lot'], options['une_fois'])
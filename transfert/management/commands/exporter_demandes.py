@@ -0,0 +1,33 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from ...export import FORMATS, FiltreInvalide, construire_filtres, exporter
+
+
+class Command(BaseCommand):
+    help = "Exporte les demandes (table chaude + archive) en CSV ou NDJSON, en flux, pour la comptabilité."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--date-debut')
+        parser.add_argument('--date-fin')
+        parser.add_argument('--reseau')
+        parser.add_argument('--statut')
+        parser.add_argument('--sortie', help="Fichier de sortie (stdout par défaut).")
+        parser.add_argument('--taille-lot', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            filtres = construire_filtres(options['date_debut'], options['date_fin'], options['reseau'], options['statut'])
+        except FiltreInvalide as e:
+            raise CommandError(str(e))
+
+        sortie = open(options['sortie'], 'wb') if options['sortie'] else sys.stdout.buffer
+        try:
+            for morceau in exporter(options['type'], filtres, options['gzip'], options['taille_lot']):
+                sortie.write(morceau)
+        finally:
+            if options['sortie']:
+                sortie.close()
+            else:
+                sortie.flush()
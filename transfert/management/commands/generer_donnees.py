@@ -0,0 +1,82 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from ...cache_demandes import planifier_changement_version
+from ...cumuls import reconstruire_cumuls
+from ...models import Utilisateur, DemandeTransfert
+from ...ussd import generer_code_ussd
+
+
+class Command(BaseCommand):
+    help = ("Insère des utilisateurs et des demandes synthétiques (bulk_create par lot) pour les benchmarks : "
+            "numéros <prefixe><8 chiffres>, même PIN pour tous, demandes réparties sur les réseaux et sur "
+            "--jours jours. Les cumuls journaliers sont reconstruits à la fin.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--utilisateurs', type=int, default=1000)
+        parser.add_argument('--demandes', type=int, default=10000)
+        parser.add_argument('--en-attente', type=float, default=0.2, help="Part des demandes en attente (0-1).")
+        parser.add_argument('--jours', type=int, default=30)
+        parser.add_argument('--prefixe', default='06')
+        parser.add_argument('--pin', default='1234')
+        parser.add_argument('--lot', type=int, default=5000)
+        parser.add_argument('--graine', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if len(options['prefixe']) + 8 > Utilisateur._meta.get_field('numero').max_length:
+            raise CommandError("Préfixe trop long.")
+        aleatoire = random.Random(options['graine'])
+        debut = time.perf_counter()
+
+        # 🔑 Un seul hachage pour tous : l'insertion n'est pas limitée par PBKDF2
+        code_pin = make_password(options['pin'])
+        numeros = [f"{options['prefixe']}{i:08d}" for i in range(options['utilisateurs'])]
+        existants = set(Utilisateur.objects.filter(numero__in=numeros).values_list('numero', flat=True))
+        Utilisateur.objects.bulk_create(
+            (Utilisateur(nom_complet=f"Bench {numero}", numero=numero, code_pin=code_pin)
+             for numero in numeros if numero not in existants),
+            batch_size=options['lot'],
+        )
+        ids = list(Utilisateur.objects.filter(numero__in=numeros).values_list('id', flat=True))
+        if options['demandes'] and not ids:
+            raise CommandError("Aucun utilisateur à qui rattacher les demandes.")
+
+        maintenant = timezone.now()
+        secondes = options['jours'] * 86400
+        with transaction.atomic():
+            for depart in range(0, options['demandes'], options['lot']):
+                demandes = []
+                for _ in range(depart, min(depart + options['lot'], options['demandes'])):
+                    if aleatoire.random() < options['en_attente']:
+                        statut = 'en_attente'
+                    else:
+                        statut = 'valide' if aleatoire.random() < 0.9 else 'echec'
+                    demande = DemandeTransfert(
+                        utilisateur_id=aleatoire.choice(ids),
+                        numero_destinataire=f"01{aleatoire.randrange(10 ** 8):08d}",
+                        reseau=aleatoire.choice(settings.TRANSFERT_RESEAUX),
+                        montant=Decimal(aleatoire.randrange(1, 100) * 500),
+                        numero_wave=f"07{aleatoire.randrange(10 ** 8):08d}",
+                        methode_paiement='wave',
+                        statut=statut,
+                        date_creation=maintenant - timedelta(seconds=aleatoire.randrange(secondes or 1)),
+                    )
+                    demande.code_ussd = generer_code_ussd(demande)
+                    demandes.append(demande)
+                DemandeTransfert.objects.bulk_create(demandes)
+
+            # 📣 bulk_create n'émet aucun signal : cumuls et version de la file remis à jour ici
+            reconstruire_cumuls()
+            planifier_changement_version(*settings.TRANSFERT_RESEAUX)
+
+        duree = time.perf_counter() - debut
+        self.stdout.write(
+            f"{len(numeros) - len(existants)} utilisateur(s) et {options['demandes']} demande(s) "
+            f"insérés en {duree:.2f} s."
+        )
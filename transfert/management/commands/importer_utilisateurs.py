@@ -0,0 +1,38 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from ...inscriptions import LECTEURS, importer_utilisateurs, initialiser_processus
+
+
+class Command(BaseCommand):
+    help = ("Inscrit en masse des utilisateurs depuis un fichier CSV (nom_complet,numero,pin) ou NDJSON : "
+            "mêmes règles que /api/inscription/, PIN hachés sur un pool de processus, bulk_create par lot.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichier', help="Chemin du fichier, ou - pour stdin.")
+        parser.add_argument('--type', choices=sorted(LECTEURS), help="Déduit de l'extension par défaut.")
+        parser.add_argument('--lot', type=int, default=500)
+        parser.add_argument('--processus', type=int, default=os.cpu_count())
+
+    def handle(self, *args, **options):
+        type_fichier = options['type'] or Path(options['fichier']).suffix.lstrip('.').lower()
+        if type_fichier not in LECTEURS:
+            raise CommandError("Préciser --type csv ou ndjson.")
+
+        flux = sys.stdin if options['fichier'] == '-' else open(options['fichier'], encoding='utf-8-sig', newline='')
+        try:
+            with ProcessPoolExecutor(max_workers=options['processus'], initializer=initialiser_processus) as pool:
+                resultat = importer_utilisateurs(LECTEURS[type_fichier](flux), pool, options['lot'])
+        finally:
+            if flux is not sys.stdin:
+                flux.close()
+
+        for invalide in resultat.invalides:
+            self.stderr.write(f"Ligne {invalide['ligne']} ({invalide['numero']}) : {invalide['error']}")
+        self.stdout.write(
+            f"{resultat.crees} utilisateur(s) créé(s), {len(resultat.deja_inscrits)} déjà inscrit(s), "
+            f"{len(resultat.invalides)} invalide(s) en {resultat.duree:.2f} s "
+            f"({resultat.debit:.1f} utilisateurs/s, {options['processus']} processus)"
+        )
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from transfert.bench import environnement, manage, serveur
+
+
+class Command(BaseCommand):
+    help = ("Profil d'import de backendorhelo.wsgi + urlconf, ce que paie la première requête d'un worker "
+            "(python -X importtime), et avec --gunicorn le temps jusqu'à la première réponse.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='backendorhelo.wsgi')
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--repetitions', type=int, default=5)
+        parser.add_argument('--gunicorn', action='store_true')
+        parser.add_argument('--workers', type=int, default=2)
+
+    def importer(self, module):
+        debut = time.perf_counter()
+        resultat = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             f"import {module}; from django.urls import get_resolver; get_resolver().url_patterns"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        return time.perf_counter() - debut, resultat.stderr
+
+    def handle(self, *args, **options):
+        durees = []
+        for _ in range(options['repetitions']):
+            duree, trace = self.importer(options['module'])
+            durees.append(duree)
+
+        propre, paquets = {}, defaultdict(int)
+        for ligne in trace.splitlines():
+            if not ligne.startswith("import time:") or "self [us]" in ligne:
+                continue
+            soi, _, nom = ligne[len("import time:"):].split("|")
+            nom = nom.strip()
+            propre[nom] = int(soi)
+            paquets[nom.split(".")[0]] += int(soi)
+
+        self.stdout.write(f"Import de {options['module']} + urlconf (processus complet) : min {min(durees) * 1000:.0f} ms "
+                          f"sur {len(durees)} essais")
+        self.stdout.write("\nPar paquet (somme des temps propres) :")
+        for nom, us in sorted(paquets.items(), key=lambda p: -p[1])[:options['top']]:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {nom}")
+        self.stdout.write("\nModules les plus coûteux (propre) :")
+        for nom, us in sorted(propre.items(), key=lambda p: -p[1])[:options['top']]:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {nom}")
+
+        if options['gunicorn']:
+            with tempfile.TemporaryDirectory() as dossier:
+                env = environnement(
+                    Path(dossier) / "demarrage.sqlite3", CACHE_DOSSIER=str(Path(dossier) / "cache"),
+                    METRIQUES_DOSSIER=dossier,
+                )
+                manage(env, "migrate", "--noinput")
+                debut = time.perf_counter()
+                with serveur("sync", options['workers'], env):
+                    duree = time.perf_counter() - debut
+            self.stdout.write(f"\ngunicorn ({options['workers']} workers) : première réponse après {duree * 1000:.0f} ms")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ...idempotence import purger_cles_expirees
+
+
+class Command(BaseCommand):
+    help = "Supprime les clés Idempotency-Key plus anciennes que TRANSFERT_IDEMPOTENCE_DUREE."
+
+    def handle(self, *args, **options):
+        supprimees = purger_cles_expirees()
+        self.stdout.write(f"{supprimees} clé(s) supprimée(s).")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ...cumuls import reconstruire_cumuls
+
+
+class Command(BaseCommand):
+    help = "Recalcule la table des cumuls journaliers à partir de l'historique des demandes."
+
+    def handle(self, *args, **options):
+        lignes = reconstruire_cumuls()
+        self.stdout.write(f"{lignes} ligne(s) de cumul reconstruite(s).")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from ...points import verifier_soldes
+
+
+class Command(BaseCommand):
+    help = ("Vérifie solde_points de chaque utilisateur contre la somme du journal MouvementPoints, "
+            "par lots ; --corriger recale les soldes en écart sur le journal.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lot', type=int, default=1000)
+        parser.add_argument('--corriger', action='store_true')
+
+    def handle(self, *args, **options):
+        ecarts = 0
+        for id_utilisateur, solde, journal in verifier_soldes(options['lot'], options['corriger']):
+            ecarts += 1
+            self.stdout.write(f"Utilisateur {id_utilisateur} : solde {solde}, journal {journal}")
+
+        action = "corrigé(s)" if options['corriger'] else "trouvé(s)"
+        self.stdout.write(f"{ecarts} écart(s) {action}.")
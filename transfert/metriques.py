@@ -0,0 +1,214 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+BORNES_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# 📊 Registre en mémoire du processus, recopié dans METRIQUES_DOSSIER/metriques-<pid>.json
+#    pour que /metrics agrège tous les workers gunicorn (et le worker d'outbox)
+class Registre:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.compteurs = defaultdict(float)
+        self.histogrammes = {}
+        self._derniere_ecriture = 0.0
+
+    def incrementer(self, nom, labels=(), valeur=1):
+        with self._verrou:
+            self.compteurs[(nom, labels)] += valeur
+
+    def observer(self, nom, labels, valeur):
+        with self._verrou:
+            histogramme = self.histogrammes.get((nom, labels))
+            if histogramme is None:
+                histogramme = self.histogrammes[(nom, labels)] = [[0] * (len(BORNES_DUREE) + 1), 0.0]
+            for i, borne in enumerate(BORNES_DUREE):
+                if valeur <= borne:
+                    break
+            else:
+                i = len(BORNES_DUREE)
+            histogramme[0][i] += 1
+            histogramme[1] += valeur
+
+    def instantane(self):
+        with self._verrou:
+            return {
+                "compteurs": [[nom, list(labels), v] for (nom, labels), v in self.compteurs.items()],
+                "histogrammes": [[nom, list(labels), list(h[0]), h[1]] for (nom, labels), h in self.histogrammes.items()],
+            }
+
+    def ecrire(self):
+        dossier = Path(settings.METRIQUES_DOSSIER)
+        dossier.mkdir(parents=True, exist_ok=True)
+        temporaire = dossier / f".metriques-{os.getpid()}-{threading.get_ident()}.tmp"
+        temporaire.write_text(json.dumps(self.instantane()))
+        os.replace(temporaire, dossier / f"metriques-{os.getpid()}.json")
+        self._derniere_ecriture = time.monotonic()
+
+    def ecrire_si_necessaire(self):
+        if time.monotonic() - self._derniere_ecriture >= settings.METRIQUES_INTERVALLE_ECRITURE:
+            self.ecrire()
+
+
+registre = Registre()
+atexit.register(registre.ecrire)
+
+
+# 🔹 Agrégation de tous les processus (l'état du processus courant est pris en mémoire)
+def agreger():
+    instantanes = [registre.instantane()]
+    propre = f"metriques-{os.getpid()}.json"
+    dossier = Path(settings.METRIQUES_DOSSIER)
+    if dossier.exists():
+        for fichier in dossier.glob("metriques-*.json"):
+            if fichier.name == propre:
+                continue
+            try:
+                instantanes.append(json.loads(fichier.read_text()))
+            except (OSError, ValueError):
+                continue
+
+    compteurs = defaultdict(float)
+    histogrammes = {}
+    for instantane in instantanes:
+        for nom, labels, valeur in instantane["compteurs"]:
+            compteurs[(nom, tuple(map(tuple, labels)))] += valeur
+        for nom, labels, seaux, somme in instantane["histogrammes"]:
+            cle = (nom, tuple(map(tuple, labels)))
+            total = histogrammes.setdefault(cle, [[0] * len(seaux), 0.0])
+            total[0] = [a + b for a, b in zip(total[0], seaux)]
+            total[1] += somme
+    return compteurs, histogrammes
+
+
+def _labels(labels, **extra):
+    paires = list(labels) + list(extra.items())
+    if not paires:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in paires) + "}"
+
+
+# 🔹 Format texte Prometheus
+def format_prometheus():
+    compteurs, histogrammes = agreger()
+    lignes = []
+
+    for nom in sorted({nom for nom, _ in compteurs}):
+        lignes.append(f"# TYPE {nom} counter")
+        for (n, labels), valeur in sorted(compteurs.items()):
+            if n == nom:
+                lignes.append(f"{nom}{_labels(labels)} {valeur:g}")
+
+    for nom in sorted({nom for nom, _ in histogrammes}):
+        lignes.append(f"# TYPE {nom} histogram")
+        for (n, labels), (seaux, somme) in sorted(histogrammes.items()):
+            if n != nom:
+                continue
+            cumul = 0
+            for borne, nombre in zip(BORNES_DUREE + ("+Inf",), seaux):
+                cumul += nombre
+                lignes.append(f"{nom}_bucket{_labels(labels, le=borne)} {cumul}")
+            lignes.append(f"{nom}_sum{_labels(labels)} {somme:g}")
+            lignes.append(f"{nom}_count{_labels(labels)} {cumul}")
+
+    return "\n".join(lignes) + "\n"
+
+
+# 🗄️ Comptage SQL : un execute_wrapper posé sur chaque connexion, rattaché à la requête
+#    HTTP en cours par une ContextVar (suit aussi les appels sync_to_async des vues async)
+class MesureSQL:
+    __slots__ = ("nombre", "duree")
+
+    def __init__(self):
+        self.nombre = 0
+        self.duree = 0.0
+
+
+_mesure_sql = ContextVar("mesure_sql", default=None)
+
+
+def _compter_sql(execute, sql, params, many, context):
+    mesure = _mesure_sql.get()
+    if mesure is None:
+        return execute(sql, params, many, context)
+
+    debut = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        mesure.nombre += 1
+        mesure.duree += time.perf_counter() - debut
+
+
+@receiver(connection_created)
+def instrumenter_connexion(sender, connection, **kwargs):
+    if _compter_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_compter_sql)
+
+
+# ⏱️ Latence par route, nombre et durée des requêtes SQL
+class MetriquesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.est_async = iscoroutinefunction(get_response)
+        if self.est_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.est_async:
+            return self.__acall__(request)
+
+        mesure = MesureSQL()
+        jeton = _mesure_sql.set(mesure)
+        debut = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _mesure_sql.reset(jeton)
+        self.enregistrer(request, response, time.perf_counter() - debut, mesure)
+        return response
+
+    async def __acall__(self, request):
+        mesure = MesureSQL()
+        jeton = _mesure_sql.set(mesure)
+        debut = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _mesure_sql.reset(jeton)
+        self.enregistrer(request, response, time.perf_counter() - debut, mesure)
+        return response
+
+    def enregistrer(self, request, response, duree, mesure):
+        correspondance = getattr(request, "resolver_match", None)
+        route = correspondance.route if correspondance else "inconnue"
+        labels = (("route", route), ("methode", request.method))
+
+        registre.incrementer("http_requetes_total", labels + (("code", response.status_code),))
+        registre.observer("http_duree_secondes", labels, duree)
+        registre.incrementer("sql_requetes_total", labels, mesure.nombre)
+        registre.incrementer("sql_duree_secondes_total", labels, mesure.duree)
+        registre.ecrire_si_necessaire()
+
+
+# 🔔 Envois FCM (appelé par l'outbox)
+def observer_fcm(duree, succes, echecs, erreur=False):
+    registre.observer("fcm_duree_secondes", (), duree)
+    registre.incrementer("fcm_messages_total", (("resultat", "succes"),), succes)
+    registre.incrementer("fcm_messages_total", (("resultat", "echec"),), echecs)
+    if erreur:
+        registre.incrementer("fcm_erreurs_envoi_total")
+    registre.ecrire_si_necessaire()
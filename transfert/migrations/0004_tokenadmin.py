@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+import os
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def importer_token_fichier(apps, schema_editor):
+    # Reprise de l'ancien token_admin.txt (un seul opérateur) dans la table
+    chemin = os.path.join(settings.BASE_DIR, "token_admin.txt")
+    if not os.path.exists(chemin):
+        return
+
+    with open(chemin, "r") as f:
+        token = f.read().strip()
+
+    if token:
+        TokenAdmin = apps.get_model('transfert', 'TokenAdmin')
+        TokenAdmin.objects.get_or_create(token=token)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0003_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenAdmin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=255, unique=True)),
+                ('actif', models.BooleanField(default=True)),
+                ('date_creation', models.DateTimeField(default=django.utils.timezone.now)),
+                ('date_maj', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(importer_token_fichier, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0004_tokenadmin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demandetransfert',
+            index=models.Index(fields=['statut', 'date_creation', 'id'], name='demande_statut_date_idx'),
+        ),
+    ]
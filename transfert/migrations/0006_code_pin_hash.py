@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0005_demande_statut_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='utilisateur',
+            name='code_pin',
+            field=models.CharField(max_length=128),
+        ),
+    ]
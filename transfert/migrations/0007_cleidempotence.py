@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0006_code_pin_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CleIdempotence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=255)),
+                ('empreinte', models.CharField(max_length=64)),
+                ('code_http', models.PositiveSmallIntegerField(default=0)),
+                ('reponse', models.JSONField(default=dict)),
+                ('date_creation', models.DateTimeField(default=django.utils.timezone.now)),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='transfert.utilisateur')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date_creation'], name='idempotence_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('utilisateur', 'cle'), name='idempotence_utilisateur_cle_unique')],
+            },
+        ),
+    ]
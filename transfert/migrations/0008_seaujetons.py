@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0007_cleidempotence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeauJetons',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=150, unique=True)),
+                ('jetons', models.FloatField()),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+                ('echecs', models.PositiveIntegerField(default=0)),
+                ('verrouille_jusqua', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
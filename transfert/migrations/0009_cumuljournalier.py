@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0008_seaujetons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CumulJournalier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField()),
+                ('reseau', models.CharField(max_length=10)),
+                ('methode_paiement', models.CharField(max_length=10)),
+                ('statut', models.CharField(max_length=20)),
+                ('nombre', models.IntegerField(default=0)),
+                ('montant_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('jour', 'reseau', 'methode_paiement', 'statut'), name='cumul_jour_unique')],
+            },
+        ),
+    ]
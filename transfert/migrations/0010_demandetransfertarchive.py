@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0009_cumuljournalier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandeTransfertArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('numero_destinataire', models.CharField(max_length=20)),
+                ('reseau', models.CharField(max_length=10)),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('numero_wave', models.CharField(max_length=20)),
+                ('methode_paiement', models.CharField(max_length=10)),
+                ('statut', models.CharField(max_length=20)),
+                ('date_creation', models.DateTimeField()),
+                ('code_ussd', models.CharField(blank=True, max_length=100, null=True)),
+                ('date_archivage', models.DateTimeField(default=django.utils.timezone.now)),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demandes_archivees', to='transfert.utilisateur')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0010_demandetransfertarchive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demandetransfert',
+            index=models.Index(fields=['utilisateur', 'date_creation', 'id'], name='demande_utilisateur_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='demandetransfertarchive',
+            index=models.Index(fields=['utilisateur', 'date_creation', 'id'], name='archive_utilisateur_date_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0011_historique_utilisateur_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demandetransfert',
+            name='bail_expire',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='demandetransfert',
+            name='operateur',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='demandetransfertarchive',
+            name='bail_expire',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='demandetransfertarchive',
+            name='operateur',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0012_bail_operateur'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='demandetransfert',
+            index=models.Index(fields=['reseau', 'statut', 'date_creation', 'id'], name='demande_reseau_statut_idx'),
+        ),
+    ]
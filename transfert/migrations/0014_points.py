@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0013_couloirs_reseau'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='utilisateur',
+            name='solde_points',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='MouvementPoints',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('montant', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('type', models.CharField(choices=[('credit', 'Crédit'), ('debit', 'Débit'), ('remboursement', 'Remboursement')], max_length=20)),
+                ('id_demande', models.BigIntegerField(blank=True, null=True)),
+                ('date_creation', models.DateTimeField(default=django.utils.timezone.now)),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mouvements_points', to='transfert.utilisateur')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['utilisateur', 'id'], name='mouvement_utilisateur_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('id_demande__isnull', False)), fields=('id_demande', 'type'), name='mouvement_demande_type_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfert', '0014_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenementAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_demande', models.BigIntegerField()),
+                ('reseau', models.CharField(max_length=10)),
+                ('ancien_statut', models.CharField(max_length=20)),
+                ('statut', models.CharField(max_length=20)),
+                ('operateur', models.CharField(blank=True, max_length=100, null=True)),
+                ('code_ussd', models.CharField(blank=True, max_length=100, null=True)),
+                ('date_creation', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['id_demande', 'date_creation', 'id'], name='audit_demande_idx'), models.Index(fields=['operateur', 'date_creation', 'id'], name='audit_operateur_idx'), models.Index(fields=['date_creation', 'id'], name='audit_date_idx')],
+            },
+        ),
+    ]
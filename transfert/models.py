@@ -4,9 +4,12 @@ from django.utils import timezone
 class Utilisateur(models.Model):
     nom_complet = models.CharField(max_length=100)
     numero = models.CharField(max_length=20, unique=True)
-    code_pin = models.CharField(max_length=6)  # 4 à 6 chiffres
+    code_pin = models.CharField(max_length=128)  # hash make_password du PIN (4 chiffres)
     date_creation = models.DateTimeField(auto_now_add=True)
 
+    # 🎯 Solde de points, dénormalisé : somme de MouvementPoints, modifié uniquement par F() (transfert/points.py)
+    solde_points = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     def __str__(self):
         return f"{self.nom_complet} ({self.numero})"
 
@@ -51,5 +54,211 @@ class DemandeTransfert(models.Model):
     # 📞 Code USSD généré et exécuté côté admin
     code_ussd = models.CharField(max_length=100, blank=True, null=True)
 
+    # 🙋 Bail : opérateur qui a réservé la demande (/api/reserver/) et fin de la réservation.
+    #    Un bail expiré vaut libération automatique.
+    operateur = models.CharField(max_length=100, blank=True, null=True)
+    bail_expire = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # 📡 File d'attente admin : filtre statut + pagination keyset (date_creation, id)
+            models.Index(fields=['statut', 'date_creation', 'id'], name='demande_statut_date_idx'),
+            # 🧾 Historique d'un utilisateur (keyset sur date_creation, id)
+            models.Index(fields=['utilisateur', 'date_creation', 'id'], name='demande_utilisateur_date_idx'),
+            # 📶 Couloirs par réseau (liste et réservation d'un seul réseau)
+            models.Index(fields=['reseau', 'statut', 'date_creation', 'id'], name='demande_reseau_statut_idx'),
+        ]
+
+    def __str__(self):
+        return f"Transfert {self.id} - {self.numero_destinataire} ({self.statut})"
+
+
+class DemandeTransfertArchive(models.Model):
+    # 🗄️ Demandes terminées (valide / echec) sorties de la table chaude par `archiver_demandes`.
+    #    Mêmes champs et même id que DemandeTransfert.
+    id = models.BigIntegerField(primary_key=True)
+    utilisateur = models.ForeignKey("Utilisateur", on_delete=models.CASCADE, related_name="demandes_archivees")
+    numero_destinataire = models.CharField(max_length=20)
+    reseau = models.CharField(max_length=10)
+    montant = models.DecimalField(max_digits=10, decimal_places=2)
+    numero_wave = models.CharField(max_length=20)
+    methode_paiement = models.CharField(max_length=10)
+    statut = models.CharField(max_length=20)
+    date_creation = models.DateTimeField()
+    code_ussd = models.CharField(max_length=100, blank=True, null=True)
+    operateur = models.CharField(max_length=100, blank=True, null=True)
+    bail_expire = models.DateTimeField(blank=True, null=True)
+
+    date_archivage = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['utilisateur', 'date_creation', 'id'], name='archive_utilisateur_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Transfert archivé {self.id} - {self.numero_destinataire} ({self.statut})"
+
+
+class MouvementPoints(models.Model):
+    # 🎯 Journal des points, en ajout seul : le solde d'un utilisateur est la somme de ses mouvements
+    TYPES = [
+        ('credit', 'Crédit'),
+        ('debit', 'Débit'),
+        ('remboursement', 'Remboursement'),
+    ]
+
+    utilisateur = models.ForeignKey("Utilisateur", on_delete=models.CASCADE, related_name="mouvements_points")
+    montant = models.DecimalField(max_digits=12, decimal_places=2)  # négatif pour un débit
+    type = models.CharField(max_length=20, choices=TYPES)
+
+    # 🔗 Id de la demande (pas de clé étrangère : la demande peut passer dans l'archive)
+    id_demande = models.BigIntegerField(blank=True, null=True)
+    date_creation = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Une demande n'est débitée, puis remboursée, qu'une seule fois
+            models.UniqueConstraint(
+                fields=['id_demande', 'type'], condition=models.Q(id_demande__isnull=False),
+                name='mouvement_demande_type_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['utilisateur', 'id'], name='mouvement_utilisateur_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Le journal des points est en ajout seul.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.type} {self.montant} ({self.utilisateur_id})"
+
+
+class EvenementAudit(models.Model):
+    # 🧾 Changement de statut d'une demande, en ajout seul (écrit en différé par transfert/audit.py)
+    id_demande = models.BigIntegerField()
+    reseau = models.CharField(max_length=10)
+    ancien_statut = models.CharField(max_length=20)
+    statut = models.CharField(max_length=20)
+    operateur = models.CharField(max_length=100, blank=True, null=True)
+    code_ussd = models.CharField(max_length=100, blank=True, null=True)
+
+    # 🕒 Moment du changement (pas celui de l'écriture en base)
+    date_creation = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id_demande', 'date_creation', 'id'], name='audit_demande_idx'),
+            models.Index(fields=['operateur', 'date_creation', 'id'], name='audit_operateur_idx'),
+            models.Index(fields=['date_creation', 'id'], name='audit_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Le journal d'audit est en ajout seul.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Demande {self.id_demande} : {self.ancien_statut} → {self.statut}"
+
+
+class CumulJournalier(models.Model):
+    # 📈 Volume par jour × réseau × méthode × statut, tenu à jour à chaque création / changement de statut
+    jour = models.DateField()
+    reseau = models.CharField(max_length=10)
+    methode_paiement = models.CharField(max_length=10)
+    statut = models.CharField(max_length=20)
+
+    nombre = models.IntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['jour', 'reseau', 'methode_paiement', 'statut'], name='cumul_jour_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.jour} {self.reseau}/{self.methode_paiement}/{self.statut} : {self.nombre}"
+
+
+class CleIdempotence(models.Model):
+    # 🔁 Réponse déjà renvoyée pour un en-tête Idempotency-Key (par utilisateur)
+    utilisateur = models.ForeignKey("Utilisateur", on_delete=models.CASCADE)
+    cle = models.CharField(max_length=255)
+
+    # 🧾 Empreinte des champs de la requête : même clé + autre contenu = conflit
+    empreinte = models.CharField(max_length=64)
+
+    code_http = models.PositiveSmallIntegerField(default=0)
+    reponse = models.JSONField(default=dict)
+    date_creation = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['utilisateur', 'cle'], name='idempotence_utilisateur_cle_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date_creation'], name='idempotence_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency-Key {self.cle} ({self.utilisateur_id})"
+
+
+class SeauJetons(models.Model):
+    # 🪣 Seau de jetons partagé entre workers (clé "ip:…", "numero:…" ou "utilisateur:…")
+    cle = models.CharField(max_length=150, unique=True)
+    jetons = models.FloatField()
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    # 🔒 Verrouillage progressif après des PIN incorrects successifs
+    echecs = models.PositiveIntegerField(default=0)
+    verrouille_jusqua = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.cle} ({self.jetons:.1f} jetons)"
+
+
+class TokenAdmin(models.Model):
+    # 📱 Token FCM d'un appareil opérateur (un par téléphone)
+    token = models.CharField(max_length=255, unique=True)
+
+    # 🚫 Désactivé automatiquement quand Firebase signale le token comme invalide
+    actif = models.BooleanField(default=True)
+
+    date_creation = models.DateTimeField(default=timezone.now)
+    date_maj = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Token admin {self.id} ({'actif' if self.actif else 'inactif'})"
+
+
+class NotificationOutbox(models.Model):
+    # 🔔 Notification admin en attente d'envoi (écrite dans la même transaction que la demande)
+    titre = models.CharField(max_length=100)
+    corps = models.CharField(max_length=255)
+
+    statut = models.CharField(max_length=20, default='en_attente', choices=[
+        ('en_attente', 'En attente'),
+        ('envoye', 'Envoyé'),
+        ('echec', 'Échec'),
+    ])
+
+    # 🔁 Nombre d'essais et date du prochain essai (backoff exponentiel)
+    tentatives = models.PositiveIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    derniere_erreur = models.TextField(blank=True, default='')
+
+    date_creation = models.DateTimeField(default=timezone.now)
+    date_envoi = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['statut', 'prochaine_tentative'], name='outbox_statut_prochaine_idx'),
+        ]
+
     def __str__(self):
-        return f"Transfert {self.id} - {self.numero_destinataire} ({self.statut})"
\ No newline at end of file
+        return f"Notification {self.id} - {self.titre} ({self.statut})"
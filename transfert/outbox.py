@@ -0,0 +1,147 @@
+import fcntl
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .models import NotificationOutbox
+from .metriques import observer_fcm
+from .views.fcm_utils import lire_tokens_admin, envoyer_messages_fcm, desactiver_tokens, tokens_invalides
+
+logger = logging.getLogger(__name__)
+
+
+# 🔹 Ajout d'une notification dans l'outbox (à appeler dans la transaction de la demande)
+def enfiler_notification(titre, corps):
+    return NotificationOutbox.objects.create(titre=titre, corps=corps)
+
+
+# 🔹 Une seule notification → message d'origine, sinon un résumé ("12 nouvelles demandes")
+def regrouper_notifications(notifications):
+    if len(notifications) == 1:
+        return notifications[0].titre, notifications[0].corps
+    return "Nouvelles demandes", f"{len(notifications)} nouvelles demandes"
+
+
+def _delai_backoff(tentatives):
+    delai = settings.OUTBOX_BACKOFF_BASE * (2 ** (tentatives - 1))
+    return timedelta(seconds=min(delai, settings.OUTBOX_BACKOFF_MAX))
+
+
+# 🔹 Envoi d'un lot de notifications dues ; retourne le nombre de lignes traitées
+def traiter_outbox(transport=None, taille_lot=None):
+    transport = transport or envoyer_messages_fcm
+    taille_lot = taille_lot or settings.OUTBOX_TAILLE_LOT
+    maintenant = timezone.now()
+
+    notifications = list(
+        NotificationOutbox.objects
+        .filter(statut='en_attente', prochaine_tentative__lte=maintenant)
+        .order_by('date_creation')[:taille_lot]
+    )
+    if not notifications:
+        return 0
+
+    erreur = None
+    tokens = lire_tokens_admin()
+    if not tokens:
+        erreur = "Aucun token admin enregistré"
+    else:
+        titre, corps = regrouper_notifications(notifications)
+        debut = time.perf_counter()
+        try:
+            reponse = transport(titre, corps, tokens)
+            observer_fcm(time.perf_counter() - debut, reponse.success_count, reponse.failure_count)
+            desactiver_tokens(tokens_invalides(tokens, reponse))
+            if not reponse.success_count:
+                erreur = "; ".join(str(r.exception) for r in reponse.responses if r.exception)
+        except Exception as e:
+            observer_fcm(time.perf_counter() - debut, 0, len(tokens), erreur=True)
+            erreur = str(e)
+
+    for notification in notifications:
+        if erreur is None:
+            notification.statut = 'envoye'
+            notification.date_envoi = maintenant
+            continue
+
+        notification.tentatives += 1
+        notification.derniere_erreur = erreur
+        if notification.tentatives >= settings.OUTBOX_TENTATIVES_MAX:
+            notification.statut = 'echec'
+        else:
+            notification.prochaine_tentative = maintenant + _delai_backoff(notification.tentatives)
+
+    NotificationOutbox.objects.bulk_update(
+        notifications,
+        ['statut', 'date_envoi', 'tentatives', 'derniere_erreur', 'prochaine_tentative']
+    )
+
+    if erreur is None:
+        logger.info(f"Outbox : {len(notifications)} notification(s) envoyée(s) à {len(tokens)} appareil(s)")
+    else:
+        logger.error(f"Erreur envoi FCM (outbox) : {erreur}")
+
+    return len(notifications)
+
+
+# 🔁 Boucle de vidage (commande envoyer_notifications, ou thread d'un worker web)
+def vider_en_boucle(intervalle=None, taille_lot=None, une_fois=False):
+    intervalle = intervalle or settings.OUTBOX_INTERVALLE
+    while True:
+        try:
+            traitees = traiter_outbox(taille_lot=taille_lot)
+        except Exception:
+            logger.exception("Outbox : échec du vidage, nouvel essai dans %s s", intervalle)
+            traitees = 0
+        finally:
+            connection.close_if_unusable_or_obsolete()
+        if une_fois and not traitees:
+            return
+        if not traitees:
+            # ⏳ La pause regroupe les rafales de demandes en un seul résumé
+            time.sleep(intervalle)
+
+
+# 🔒 Verrou fichier non bloquant (flock) : un seul vidage à la fois entre les workers d'une même base.
+#    Libéré par le système si le worker meurt ; retourne le fichier ouvert, ou None si déjà pris.
+def prendre_verrou(chemin):
+    fichier = open(chemin, "a")
+    try:
+        fcntl.flock(fichier, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fichier.close()
+        return None
+    return fichier
+
+
+def chemin_verrou():
+    return f"{settings.DATABASES['default']['NAME']}.outbox.lock"
+
+
+_vidage_local = None
+_verrou_vidage = threading.Lock()
+
+
+# 🧵 SQLite (OUTBOX_DANS_WEB) : appelé par chaque worker gunicorn ; un seul obtient le verrou
+#    et vide l'outbox, les autres réessaient pour prendre le relais s'il s'arrête
+def demarrer_vidage_local():
+    global _vidage_local
+    if not settings.OUTBOX_DANS_WEB:
+        return None
+
+    def boucle():
+        while True:
+            verrou = prendre_verrou(chemin_verrou())
+            if verrou is not None:
+                logger.info("Outbox vidée par ce worker")
+                vider_en_boucle()
+            time.sleep(settings.OUTBOX_INTERVALLE * 5)
+
+    with _verrou_vidage:
+        if _vidage_local is None or not _vidage_local.is_alive():
+            _vidage_local = threading.Thread(target=boucle, name="outbox", daemon=True)
+            _vidage_local.start()
+    return _vidage_local
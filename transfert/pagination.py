@@ -0,0 +1,101 @@
+import base64
+import heapq
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class CurseurInvalide(ValueError):
+    pass
+
+
+# 🔹 Curseur opaque : base64("<date_creation ISO>|<id>")
+def encoder_curseur(date_creation, id):
+    return base64.urlsafe_b64encode(f"{date_creation.isoformat()}|{id}".encode()).decode()
+
+
+def decoder_curseur(valeur):
+    if not valeur:
+        return None
+    try:
+        date_texte, id_texte = base64.urlsafe_b64decode(valeur.encode()).decode().rsplit("|", 1)
+        date_creation = parse_datetime(date_texte)
+        if date_creation is None:
+            raise ValueError
+        return date_creation, int(id_texte)
+    except (ValueError, UnicodeError):
+        raise CurseurInvalide("Curseur invalide.")
+
+
+def _cle(ligne):
+    if isinstance(ligne, dict):
+        return ligne["date_creation"], ligne["id"]
+    return ligne.date_creation, ligne.id
+
+
+# 📄 Pagination keyset sur (date_creation, id), sans OFFSET ni COUNT
+#   - ?after=<curseur> : page suivante, des plus récentes aux plus anciennes
+#   - ?since=<curseur> : uniquement ce qui a été créé depuis, des plus anciennes aux plus récentes
+class PageKeyset:
+    def __init__(self, request):
+        params = getattr(request, "query_params", request.GET)
+        try:
+            limite = int(params.get("limit", settings.TRANSFERT_PAGE_TAILLE))
+        except ValueError:
+            raise CurseurInvalide("Paramètre limit invalide.")
+        self.limite = max(1, min(limite, settings.TRANSFERT_PAGE_TAILLE_MAX))
+
+        self.apres = decoder_curseur(params.get("after"))
+        self.depuis = decoder_curseur(params.get("since"))
+        if self.apres and self.depuis:
+            raise CurseurInvalide("Utiliser after ou since, pas les deux.")
+
+        self.lignes = []
+        self.encore = False
+
+    def _filtrer(self, queryset):
+        if self.depuis:
+            date_creation, id = self.depuis
+            return queryset.filter(
+                Q(date_creation__gt=date_creation) | Q(date_creation=date_creation, id__gt=id)
+            ).order_by("date_creation", "id")
+
+        if self.apres:
+            date_creation, id = self.apres
+            queryset = queryset.filter(
+                Q(date_creation__lt=date_creation) | Q(date_creation=date_creation, id__lt=id)
+            )
+        return queryset.order_by("-date_creation", "-id")
+
+    # 🔹 Accepte plusieurs querysets (ex. table chaude + archive) fusionnés dans le même ordre
+    def paginer(self, *querysets):
+        return self._fusionner([list(self._filtrer(qs)[:self.limite + 1]) for qs in querysets])
+
+    async def apaginer(self, *querysets):
+        return self._fusionner([[ligne async for ligne in self._filtrer(qs)[:self.limite + 1]] for qs in querysets])
+
+    def _fusionner(self, sources):
+        if len(sources) == 1:
+            lignes = sources[0]
+        else:
+            lignes = list(heapq.merge(*sources, key=_cle, reverse=not self.depuis))
+
+        self.encore = len(lignes) > self.limite
+        self.lignes = lignes[:self.limite]
+        return self.lignes
+
+    def reponse(self, resultats):
+        dernier = encoder_curseur(*_cle(self.lignes[-1])) if self.lignes else None
+
+        if self.depuis:
+            depuis = dernier or encoder_curseur(*self.depuis)
+        elif self.lignes:
+            depuis = encoder_curseur(*_cle(self.lignes[0]))
+        else:
+            depuis = None
+
+        return {
+            "results": resultats,
+            "next": dernier if self.encore else None,
+            "since": depuis,
+        }
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import F, Sum
+from django.dispatch import receiver
+from .models import Utilisateur, MouvementPoints
+from .signals import statut_demande_change
+
+
+class SoldeInsuffisant(Exception):
+    pass
+
+
+# 🎯 Débit conditionnel en une requête (UPDATE … WHERE solde_points >= montant) : pas de lecture
+#    préalable du solde, deux soumissions simultanées ne peuvent pas le rendre négatif
+def debiter_points(id_utilisateur, montant, id_demande=None):
+    with transaction.atomic():
+        if not Utilisateur.objects.filter(id=id_utilisateur, solde_points__gte=montant).update(
+            solde_points=F('solde_points') - montant
+        ):
+            raise SoldeInsuffisant("Solde de points insuffisant.")
+        MouvementPoints.objects.create(utilisateur_id=id_utilisateur, montant=-montant, type='debit', id_demande=id_demande)
+
+
+def crediter_points(id_utilisateur, montant, type='credit', id_demande=None):
+    with transaction.atomic():
+        Utilisateur.objects.filter(id=id_utilisateur).update(solde_points=F('solde_points') + montant)
+        MouvementPoints.objects.create(utilisateur_id=id_utilisateur, montant=montant, type=type, id_demande=id_demande)
+
+
+# 📣 Demande payée en points passée en échec : remboursée dans la même transaction
+@receiver(statut_demande_change)
+def rembourser_echec(sender, demande, ancien_statut, **kwargs):
+    if demande.methode_paiement != 'points' or demande.statut != 'echec' or ancien_statut == 'echec':
+        return
+    crediter_points(demande.utilisateur_id, demande.montant, type='remboursement', id_demande=demande.id)
+
+
+# 🔎 Compare les soldes au journal par lots d'utilisateurs (keyset sur id). Un écart est relu
+#    ligne verrouillée avant d'être signalé (un débit a pu être commité entre les deux lectures) ;
+#    avec corriger=True, le solde est alors recalé sur le journal. Produit (id, solde, somme_journal).
+def verifier_soldes(taille_lot=1000, corriger=False):
+    dernier_id = 0
+    while True:
+        utilisateurs = list(
+            Utilisateur.objects.filter(id__gt=dernier_id).order_by('id').values_list('id', 'solde_points')[:taille_lot]
+        )
+        if not utilisateurs:
+            return
+        dernier_id = utilisateurs[-1][0]
+
+        sommes = dict(
+            MouvementPoints.objects.filter(utilisateur_id__in=[u[0] for u in utilisateurs])
+            .values('utilisateur_id').annotate(total=Sum('montant')).values_list('utilisateur_id', 'total')
+        )
+        for id_utilisateur, solde in utilisateurs:
+            if solde != (sommes.get(id_utilisateur) or 0):
+                ecart = controler_solde(id_utilisateur, corriger)
+                if ecart:
+                    yield (id_utilisateur, *ecart)
+
+
+def controler_solde(id_utilisateur, corriger=False):
+    with transaction.atomic():
+        soldes = list(Utilisateur.objects.select_for_update().filter(id=id_utilisateur).values_list('solde_points', flat=True))
+        total = MouvementPoints.objects.filter(utilisateur_id=id_utilisateur).aggregate(total=Sum('montant'))['total'] or 0
+        if not soldes or soldes[0] == total:
+            return None
+        if corriger:
+            Utilisateur.objects.filter(id=id_utilisateur).update(solde_points=total)
+    return soldes[0], total
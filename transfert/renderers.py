@@ -0,0 +1,35 @@
+import decimal
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson absent : encodeur json de DRF
+    orjson = None
+
+
+# 🔹 Décimaux en texte ("100.00"), comme DecimalField des serializers
+class EncodeurJSON(JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+# Decimal → "100.00" ; textes paresseux (gettext_lazy) des messages d'erreur DRF → str
+def _defaut_orjson(obj):
+    return str(obj)
+
+
+# ⚡ Rendu JSON via orjson : accepte directement les lignes .values() (datetime → "…Z", Decimal → "100.00")
+#    Retombe sur le JSONRenderer de DRF si orjson manque ou si une indentation est demandée
+class JSONRapideRenderer(JSONRenderer):
+    encoder_class = EncodeurJSON
+    options_orjson = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_defaut_orjson, option=self.options_orjson)
@@ -46,3 +46,29 @@ class DemandeTransfertSerializer(serializers.ModelSerializer):
     class Meta:
         model = DemandeTransfert
         fields = '__all__'
+
+
+# 🔹 Projection compacte pour l'historique utilisateur (sans numero_wave ni code_ussd)
+class HistoriqueDemandeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DemandeTransfert
+        fields = ['id', 'numero_destinataire', 'reseau', 'montant', 'methode_paiement', 'statut', 'date_creation']
+
+
+# ⚡ Lecture rapide des listes admin : .values() au lieu du serializer, mêmes clés et même ordre
+#    ?fields=montant,reseau → projection ; id et date_creation toujours inclus (curseur)
+CHAMPS_DEMANDE = tuple(DemandeTransfertSerializer().fields)
+CHAMPS_CURSEUR = ('id', 'date_creation')
+
+
+class ProjectionInvalide(ValueError):
+    pass
+
+
+def lire_projection(params):
+    demandes = {c.strip() for c in (params.get('fields') or '').split(',') if c.strip()}
+    if not demandes:
+        return CHAMPS_DEMANDE
+    if demandes - set(CHAMPS_DEMANDE):
+        raise ProjectionInvalide(f"fields accepte : {', '.join(CHAMPS_DEMANDE)}.")
+    return tuple(c for c in CHAMPS_DEMANDE if c in demandes or c in CHAMPS_CURSEUR)
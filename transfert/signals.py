@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+# 📣 Envoyés par les vues à l'intérieur de la transaction qui modifie la demande.
+# Les récepteurs qui ont des effets externes doivent passer par transaction.on_commit.
+
+# kwargs : demande
+demande_creee = Signal()
+
+# kwargs : demande (statut déjà mis à jour), ancien_statut, operateur
+statut_demande_change = Signal()
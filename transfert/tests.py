@@ -1,3 +1,1011 @@
-from django.test import TestCase
+import asyncio
+import base64
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+import threading
+import time
+from types import SimpleNamespace
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import Client, TestCase, TransactionTestCase, AsyncRequestFactory, RequestFactory, override_settings
+from django.utils import timezone
+from firebase_admin import messaging
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import BaseThrottle
+from .models import Utilisateur, DemandeTransfert, NotificationOutbox, TokenAdmin, CumulJournalier, DemandeTransfertArchive, EvenementAudit
+from .audit import TamponAudit
+from .cumuls import reconstruire_cumuls
+from .serializers import DemandeTransfertSerializer
+from .archives import archiver_demandes, trouver_demande
+from .baux import reserver_demandes
+from .cache_demandes import ChangementVersion, planifier_changement_version, version_file
+from .bench import Scenario, charger_client
+from .points import crediter_points, verifier_soldes
+from .outbox import traiter_outbox, enfiler_notification, prendre_verrou, demarrer_vidage_local
+from .evenements import obtenir_bus
+from .authentication import emettre_jeton
+from .idempotence import cache_reponses
+from .throttling import autoriser, cles_pin, vider_rejets_locaux, _memoriser_rejet, _rejet_local, _rejets_locaux
+from .views.transfert_views import enregistrer_demande, lire_soumission
+from .views.async_views import SoumissionTransfertAsyncView, ValidationDemandeAsyncView, DemandesEnAttenteAsyncView
+from .views import fcm_utils
+from .views.fcm_utils import invalider_cache_tokens
 
-# Create your tests here.
+
+# 🔹 Transport Firebase factice (même forme que messaging.BatchResponse)
+class FauxTransportFCM:
+    def __init__(self, erreur=None, invalides=()):
+        self.erreur = erreur
+        self.invalides = set(invalides)
+        self.envois = []
+
+    def __call__(self, titre, corps, tokens):
+        self.envois.append((titre, corps, list(tokens)))
+        if self.erreur:
+            raise self.erreur
+        reponses = [
+            SimpleNamespace(success=False, exception=messaging.UnregisteredError("Token inconnu"))
+            if token in self.invalides else SimpleNamespace(success=True, exception=None)
+            for token in tokens
+        ]
+        succes = sum(1 for r in reponses if r.success)
+        return SimpleNamespace(responses=reponses, success_count=succes, failure_count=len(reponses) - succes)
+
+
+def creer_utilisateur(numero="0700000000", pin="1234"):
+    return Utilisateur.objects.create(nom_complet="Test", numero=numero, code_pin=make_password(pin))
+
+
+# 🔹 Cache en mémoire pour tout le module : les tests appellent cache.clear(), qui viderait
+#    sinon le dossier du cache du serveur (CACHE_DOSSIER)
+_cache_de_test = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-transfert'},
+})
+
+
+def setUpModule():
+    _cache_de_test.enable()
+
+
+def tearDownModule():
+    _cache_de_test.disable()
+
+
+def connecter_admin(client):
+    client.force_login(User.objects.create_user("admin", is_staff=True))
+
+
+# 🔹 Client connecté sous le compte admin `nom` (l'opérateur des réservations et validations)
+def client_operateur(nom):
+    client = Client()
+    client.force_login(User.objects.get_or_create(username=nom, defaults={"is_staff": True})[0])
+    return client
+
+
+def creer_demande(utilisateur, **extra):
+    champs = {
+        "utilisateur": utilisateur,
+        "numero_destinataire": "0101010101",
+        "reseau": "orange",
+        "montant": 1000,
+        "numero_wave": "0707070707",
+        "methode_paiement": "wave",
+    }
+    champs.update(extra)
+    return DemandeTransfert.objects.create(**champs)
+
+
+def donnees_transfert(utilisateur, **extra):
+    donnees = {
+        "id_utilisateur": utilisateur.id,
+        "numero_destinataire": "0101010101",
+        "reseau": "orange",
+        "montant": 1000,
+        "numero_wave": "0707070707",
+        "methode_paiement": "wave",
+    }
+    donnees.update(extra)
+    return donnees
+
+
+@mock.patch("transfert.outbox.lire_tokens_admin", return_value=["token-admin"])
+class OutboxNotificationTests(TestCase):
+    def setUp(self):
+        self.utilisateur = creer_utilisateur()
+
+    def test_soumission_sans_appel_firebase(self, _tokens):
+        with mock.patch("firebase_admin.messaging.send_each") as send_each, \
+                mock.patch("transfert.views.fcm_utils.obtenir_app_firebase") as app_firebase:
+            reponse = self.client.post("/api/transfert/", donnees_transfert(self.utilisateur), content_type="application/json")
+
+        self.assertEqual(reponse.status_code, 201)
+        send_each.assert_not_called()
+        app_firebase.assert_not_called()
+        self.assertEqual(NotificationOutbox.objects.filter(statut='en_attente').count(), 1)
+
+    def test_rafale_regroupee_en_resume(self, _tokens):
+        for _ in range(12):
+            self.client.post("/api/transfert/", donnees_transfert(self.utilisateur), content_type="application/json")
+
+        transport = FauxTransportFCM()
+        self.assertEqual(traiter_outbox(transport=transport), 12)
+        self.assertEqual(transport.envois, [("Nouvelles demandes", "12 nouvelles demandes", ["token-admin"])])
+        self.assertEqual(NotificationOutbox.objects.filter(statut='envoye').count(), 12)
+
+    def test_echec_reprogramme_avec_backoff(self, _tokens):
+        self.client.post("/api/transfert/", donnees_transfert(self.utilisateur), content_type="application/json")
+
+        traiter_outbox(transport=FauxTransportFCM(erreur=RuntimeError("indisponible")))
+        notification = NotificationOutbox.objects.get()
+        self.assertEqual(notification.statut, 'en_attente')
+        self.assertEqual(notification.tentatives, 1)
+        self.assertGreater(notification.prochaine_tentative, notification.date_creation)
+
+        # ⏳ Pas encore dû : rien n'est renvoyé
+        transport = FauxTransportFCM()
+        self.assertEqual(traiter_outbox(transport=transport), 0)
+        self.assertEqual(transport.envois, [])
+        self.assertEqual(DemandeTransfert.objects.count(), 1)
+
+    def test_un_seul_worker_vide_l_outbox(self, _tokens):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "outbox.lock"
+            premier = prendre_verrou(chemin)
+            self.assertIsNotNone(premier)
+            self.assertIsNone(prendre_verrou(chemin))
+            premier.close()
+            self.assertIsNotNone(prendre_verrou(chemin))
+
+        with override_settings(OUTBOX_DANS_WEB=False):
+            self.assertIsNone(demarrer_vidage_local())
+
+
+class DemarrageTests(TestCase):
+    def test_firebase_initialise_une_seule_fois(self):
+        with mock.patch("firebase_admin._apps", {}), \
+                mock.patch("firebase_admin.credentials.Certificate"), \
+                mock.patch("firebase_admin.initialize_app", side_effect=lambda cred: time.sleep(0.05) or object()) as init, \
+                mock.patch("transfert.views.fcm_utils._app_firebase", None):
+            threads = [threading.Thread(target=fcm_utils.obtenir_app_firebase) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(init.call_count, 1)
+
+    def test_sonde_disponibilite(self):
+        reponse = self.client.get("/pret/")
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(reponse.json()["pret"])
+
+
+class TokensAdminTests(TestCase):
+    def setUp(self):
+        invalider_cache_tokens()
+
+    def test_enregistrement_reserve_aux_admins(self):
+        reponse = self.client.post("/api/enregistrer_token_admin/", {"token": "espion"}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 403)
+        self.assertFalse(TokenAdmin.objects.exists())
+
+    def test_multicast_et_suppression_tokens_morts(self):
+        connecter_admin(self.client)
+        for token in ("telephone-1", "telephone-2", "telephone-mort"):
+            reponse = self.client.post("/api/enregistrer_token_admin/", {"token": token}, content_type="application/json")
+            self.assertEqual(reponse.status_code, 200)
+
+        enfiler_notification("Nouvelle demande", "ORANGE - 1000 F")
+        transport = FauxTransportFCM(invalides={"telephone-mort"})
+        traiter_outbox(transport=transport)
+
+        self.assertCountEqual(transport.envois[0][2], ["telephone-1", "telephone-2", "telephone-mort"])
+        self.assertFalse(TokenAdmin.objects.get(token="telephone-mort").actif)
+        self.assertEqual(NotificationOutbox.objects.get().statut, 'envoye')
+
+        enfiler_notification("Nouvelle demande", "MTN - 500 F")
+        traiter_outbox(transport=transport)
+        self.assertCountEqual(transport.envois[1][2], ["telephone-1", "telephone-2"])
+
+
+class PaginationDemandesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        utilisateur = creer_utilisateur()
+        debut = timezone.now() - timedelta(hours=1)
+        self.demandes = [creer_demande(utilisateur, date_creation=debut + timedelta(minutes=i)) for i in range(5)]
+        creer_demande(utilisateur, statut='valide')
+
+    def test_parcours_par_curseur(self):
+        page = self.client.get("/api/demandes_en_attente/?limit=2").json()
+        self.assertEqual([d["id"] for d in page["results"]], [self.demandes[4].id, self.demandes[3].id])
+
+        suite = self.client.get(f"/api/demandes_en_attente/?limit=2&after={page['next']}").json()
+        self.assertEqual([d["id"] for d in suite["results"]], [self.demandes[2].id, self.demandes[1].id])
+
+        fin = self.client.get(f"/api/demandes_en_attente/?limit=2&after={suite['next']}").json()
+        self.assertEqual([d["id"] for d in fin["results"]], [self.demandes[0].id])
+        self.assertIsNone(fin["next"])
+
+    def test_since_retourne_uniquement_les_nouvelles(self):
+        since = self.client.get("/api/demandes_en_attente/").json()["since"]
+        nouvelle = creer_demande(self.demandes[0].utilisateur)
+
+        page = self.client.get(f"/api/demandes_en_attente/?since={since}").json()
+        self.assertEqual([d["id"] for d in page["results"]], [nouvelle.id])
+
+        vide = self.client.get(f"/api/demandes_en_attente/?since={page['since']}").json()
+        self.assertEqual(vide["results"], [])
+        self.assertEqual(vide["since"], page["since"])
+
+    def test_curseur_invalide(self):
+        reponse = self.client.get("/api/demandes_en_attente/?after=xyz")
+        self.assertEqual(reponse.status_code, 400)
+
+    def test_lecture_rapide_identique_au_serializer(self):
+        attendu = DemandeTransfertSerializer(self.demandes[::-1], many=True).data
+        page = self.client.get("/api/demandes_en_attente/")
+        self.assertEqual(page.content.count(b'"montant":"1000.00"'), 5)
+        self.assertEqual(page.json()["results"], json.loads(JSONRenderer().render(attendu)))
+
+    def test_projection_fields(self):
+        page = self.client.get("/api/demandes_en_attente/?fields=montant,reseau&limit=2").json()
+        self.assertEqual(list(page["results"][0]), ["id", "reseau", "montant", "date_creation"])
+
+        suite = self.client.get(f"/api/demandes_en_attente/?fields=montant&after={page['next']}").json()
+        self.assertEqual(len(suite["results"]), 3)
+        self.assertEqual(self.client.get("/api/demandes_en_attente/?fields=code_pin").status_code, 400)
+
+
+class CacheDemandesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.utilisateur = creer_utilisateur()
+        creer_demande(self.utilisateur)
+
+    def test_304_sans_requete_sql(self):
+        premiere = self.client.get("/api/demandes_en_attente/")
+        etag = premiere["ETag"]
+
+        with self.assertNumQueries(0):
+            reponse = self.client.get("/api/demandes_en_attente/", headers={"If-None-Match": etag})
+        self.assertEqual(reponse.status_code, 304)
+        self.assertEqual(reponse["ETag"], etag)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/demandes/").json(), premiere.json())
+        self.assertNotEqual(self.client.get("/api/demandes_en_attente/?limit=1")["ETag"], etag)
+
+    def test_nouvelle_version_apres_commit(self):
+        etag = self.client.get("/api/demandes_en_attente/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/transfert/", donnees_transfert(self.utilisateur), content_type="application/json")
+
+        reponse = self.client.get("/api/demandes_en_attente/", headers={"If-None-Match": etag})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(len(reponse.json()["results"]), 2)
+
+        etag = reponse["ETag"]
+        id_demande = reponse.json()["results"][0]["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            client_operateur("op").post("/api/valider_lot/", {"demandes": [{"id_demande": id_demande}]}, content_type="application/json")
+        self.assertEqual(len(self.client.get("/api/demandes_en_attente/", headers={"If-None-Match": etag}).json()["results"]), 1)
+
+    def test_une_version_par_transaction_et_archivage_neutre(self):
+        ids = [creer_demande(self.utilisateur, reseau=reseau).id for reseau in ("orange", "mtn")]
+        with self.captureOnCommitCallbacks(execute=True) as rappels:
+            client_operateur("op").post("/api/valider_lot/", {"demandes": [{"id_demande": i} for i in ids]},
+                                        content_type="application/json")
+        changements = [r for r in rappels if isinstance(r, ChangementVersion)]
+        self.assertEqual([c.reseaux for c in changements], [{"orange", "mtn"}])
+
+        version = version_file()
+        DemandeTransfert.objects.update(date_creation=timezone.now() - timedelta(days=90))
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(5):
+            self.assertEqual(archiver_demandes(30, pause=0), 2)
+        self.assertEqual(version_file(), version)
+
+
+class VersionTransactionTests(TransactionTestCase):
+    def test_rollback_puis_un_seul_changement_au_commit(self):
+        with mock.patch("transfert.cache_demandes.changer_version") as changer:
+            with contextlib.suppress(ValueError), transaction.atomic():
+                planifier_changement_version("orange")
+                raise ValueError
+            with transaction.atomic():
+                planifier_changement_version("mtn")
+                planifier_changement_version("orange")
+                self.assertFalse(changer.called)
+
+        changer.assert_called_once()
+        self.assertCountEqual(changer.call_args.args, ["mtn", "orange"])
+
+
+class FluxDemandesTests(TestCase):
+    def test_evenement_publie_apres_commit(self):
+        utilisateur = creer_utilisateur()
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.post("/api/transfert/", donnees_transfert(utilisateur), content_type="application/json")
+
+        evenement = obtenir_bus()._historique[-1]
+        self.assertEqual(evenement.type, "created")
+        self.assertEqual(evenement.donnees["id"], reponse.json()["id_demande"])
+
+    async def connecter_operateur(self):
+        await self.async_client.aforce_login(await User.objects.acreate(username="op", is_staff=True))
+
+    async def test_reprise_depuis_last_event_id(self):
+        await self.connecter_operateur()
+        bus = obtenir_bus()
+        premier = bus.publier("created", {"id": 1})
+        bus.publier("validated", {"id": 1, "statut": "valide"})
+
+        reponse = await self.async_client.get("/api/flux/demandes/", headers={"Last-Event-ID": str(premier.id)})
+        self.assertEqual(reponse["Content-Type"], "text/event-stream")
+
+        flux = aiter(reponse.streaming_content)
+        self.assertTrue((await anext(flux)).startswith(b"retry:"))
+        self.assertIn(b"event: validated", await anext(flux))
+
+        bus.publier("created", {"id": 2})
+        self.assertIn(b'"id": 2', await anext(flux))
+        await flux.aclose()
+
+    async def test_flux_reserve_aux_admins(self):
+        self.assertEqual((await self.async_client.get("/api/flux/demandes/")).status_code, 403)
+        await self.async_client.aforce_login(await User.objects.acreate(username="client"))
+        self.assertEqual((await self.async_client.get("/api/flux/demandes/")).status_code, 403)
+
+    async def test_last_event_id_d_un_autre_worker(self):
+        await self.connecter_operateur()
+        bus = obtenir_bus()
+        evenement = bus.publier("created", {"id": 1})
+        self.assertTrue(evenement.id.startswith(f"{os.getpid()}-"))
+
+        for dernier_id in (f"{os.getpid() + 1}-{evenement.numero - 1}", str(evenement.numero - 1)):
+            reponse = await self.async_client.get("/api/flux/demandes/", headers={"Last-Event-ID": dernier_id})
+            flux = aiter(reponse.streaming_content)
+            await anext(flux)
+            self.assertIn(b"event: resync", await anext(flux))
+            await flux.aclose()
+
+        reponse = await self.async_client.get("/api/flux/demandes/", headers={"Last-Event-ID": "abc"})
+        self.assertEqual(reponse.status_code, 400)
+
+
+class StatutDemandesTests(TestCase):
+    async def test_reveil_par_le_bus(self):
+        utilisateur = await Utilisateur.objects.acreate(nom_complet="Test", numero="0700000000", code_pin="x")
+        champs = donnees_transfert(utilisateur)
+        del champs["id_utilisateur"]
+        demande = await DemandeTransfert.objects.acreate(utilisateur=utilisateur, **champs)
+        en_tetes = {"Authorization": f"Bearer {emettre_jeton(utilisateur)}"}
+        url = f"/api/statut_demandes/?ids={demande.id}&timeout=10"
+
+        debut = time.monotonic()
+        attente = asyncio.create_task(self.async_client.get(url, headers=en_tetes))
+        await asyncio.sleep(0.2)
+        self.assertFalse(attente.done())
+        await DemandeTransfert.objects.filter(id=demande.id).aupdate(statut="valide")
+        obtenir_bus().publier("validated", {"id": demande.id, "statut": "valide"})
+
+        reponse = (await attente).json()
+        self.assertLess(time.monotonic() - debut, 5)
+        self.assertEqual(reponse, {"demandes": [{"id": demande.id, "statut": "valide"}], "change": True})
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+        for timeout in ("nan", "inf"):
+            reponse = await self.async_client.get(f"/api/statut_demandes/?ids={demande.id}&timeout={timeout}", headers=en_tetes)
+            self.assertEqual(reponse.status_code, 400)
+
+    def test_reponse_immediate_et_archive(self):
+        utilisateur, autre = creer_utilisateur(), creer_utilisateur(numero="0799999999")
+        ancienne = creer_demande(utilisateur, statut="echec", date_creation=timezone.now() - timedelta(days=90))
+        archiver_demandes(30, pause=0)
+        courante, etrangere = creer_demande(utilisateur), creer_demande(autre)
+
+        reponse = self.client.get(
+            f"/api/statut_demandes/?ids={ancienne.id},{courante.id},{etrangere.id}&timeout=30",
+            headers={"Authorization": f"Bearer {emettre_jeton(utilisateur)}"},
+        ).json()
+        self.assertTrue(reponse["change"])
+        self.assertEqual(reponse["demandes"], [
+            {"id": ancienne.id, "statut": "echec"}, {"id": courante.id, "statut": "en_attente"},
+        ])
+
+
+class ValidationLotTests(TestCase):
+    def test_lot_conditionnel(self):
+        utilisateur = creer_utilisateur()
+        a, b = creer_demande(utilisateur), creer_demande(utilisateur)
+        deja = creer_demande(utilisateur, statut='valide', code_ussd='*1#')
+
+        self.assertEqual(self.client.post("/api/valider_lot/", {"demandes": [{"id_demande": a.id}]},
+                                          content_type="application/json").status_code, 403)
+        reponse = client_operateur("op").post("/api/valider_lot/", {"demandes": [
+            {"id_demande": a.id, "code_ussd": "*144#"},
+            {"id_demande": b.id, "statut": "echec"},
+            {"id_demande": deja.id, "code_ussd": "*999#"},
+            {"id_demande": 999999},
+        ]}, content_type="application/json")
+
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual([r["resultat"] for r in reponse.json()["resultats"]], ["valide", "echec", "deja_traitee", "introuvable"])
+
+        a.refresh_from_db(), b.refresh_from_db(), deja.refresh_from_db()
+        self.assertEqual((a.statut, a.code_ussd), ('valide', '*144#'))
+        self.assertEqual(b.statut, 'echec')
+        self.assertEqual(deja.code_ussd, '*1#')
+
+
+class JetonSessionTests(TestCase):
+    def setUp(self):
+        vider_rejets_locaux()
+        self.utilisateur = creer_utilisateur()
+
+    def test_jeton_emis_a_la_connexion_authentifie_le_transfert(self):
+        jeton = self.client.post("/api/connexion/", {"numero": "0700000000", "pin": "1234"}, content_type="application/json").json()["jeton"]
+
+        donnees = donnees_transfert(self.utilisateur)
+        del donnees["id_utilisateur"]
+        reponse = self.client.post("/api/transfert/", donnees, content_type="application/json", headers={"Authorization": f"Bearer {jeton}"})
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual(DemandeTransfert.objects.get().utilisateur_id, self.utilisateur.id)
+
+        reponse = self.client.post("/api/transfert/", donnees, content_type="application/json", headers={"Authorization": f"Bearer {jeton}x"})
+        self.assertEqual(reponse.status_code, 401)
+
+    def test_deverrouillage_repete_sans_rehash(self):
+        donnees = {"id_utilisateur": self.utilisateur.id, "pin": "1234"}
+        with mock.patch("transfert.authentication.check_password", return_value=True) as check_password:
+            for _ in range(3):
+                reponse = self.client.post("/api/deverrouillage/", donnees, content_type="application/json")
+                self.assertEqual(reponse.status_code, 200)
+                self.assertIn("jeton", reponse.json())
+
+        self.assertEqual(check_password.call_count, 1)
+
+
+class VuesAsyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_soumission_liste_validation(self):
+        utilisateur = await Utilisateur.objects.acreate(nom_complet="Test", numero="0700000000", code_pin="x")
+        fabrique = AsyncRequestFactory()
+
+        donnees = donnees_transfert(utilisateur)
+        del donnees["id_utilisateur"]
+        requete = fabrique.post("/api/transfert/", donnees, content_type="application/json",
+                                headers={"Authorization": f"Bearer {emettre_jeton(utilisateur)}"})
+        reponse = await SoumissionTransfertAsyncView.as_view()(requete)
+        self.assertEqual(reponse.status_code, 201)
+        id_demande = json.loads(reponse.content)["id_demande"]
+
+        reponse = await DemandesEnAttenteAsyncView.as_view()(fabrique.get("/api/demandes_en_attente/"))
+        self.assertEqual([d["id"] for d in json.loads(reponse.content)["results"]], [id_demande])
+
+        await sync_to_async(reserver_demandes)("op-a", 1)
+        requete = fabrique.post("/api/valider/", {"id_demande": id_demande, "operateur": "op-a"}, content_type="application/json")
+        self.assertEqual((await ValidationDemandeAsyncView.as_view()(requete)).status_code, 409)
+
+        await User.objects.acreate(username="op-a", is_staff=True, password=make_password("secret"))
+        basic = base64.b64encode(b"op-a:secret").decode()
+        requete = fabrique.post("/api/valider/", {"id_demande": id_demande}, content_type="application/json",
+                                headers={"Authorization": f"Basic {basic}"})
+        reponse = await ValidationDemandeAsyncView.as_view()(requete)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual((await DemandeTransfert.objects.aget(id=id_demande)).statut, 'valide')
+
+
+class ConcurrenceSQLiteTests(TransactionTestCase):
+    def test_insertions_paralleles_sans_verrou(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Profil SQLite uniquement")
+
+        with connection.cursor() as curseur:
+            curseur.execute("PRAGMA journal_mode")
+            self.assertEqual(curseur.fetchone()[0], "wal")
+
+        utilisateur = creer_utilisateur()
+        champs = lire_soumission(donnees_transfert(utilisateur))
+        erreurs = []
+
+        def inserer():
+            try:
+                for _ in range(25):
+                    enregistrer_demande(utilisateur, champs)
+            except Exception as e:
+                erreurs.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=inserer) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(erreurs, [])
+        self.assertEqual(DemandeTransfert.objects.count(), 200)
+
+    def test_reservations_paralleles_disjointes(self):
+        utilisateur = creer_utilisateur()
+        for _ in range(120):
+            creer_demande(utilisateur)
+        obtenues, erreurs = {}, []
+
+        def operateur(nom):
+            try:
+                obtenues[nom] = []
+                while True:
+                    demandes, _ = reserver_demandes(nom, 5)
+                    if not demandes:
+                        break
+                    obtenues[nom].extend(d["id"] for d in demandes)
+            except Exception as e:
+                erreurs.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=operateur, args=(f"op{i}",)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(erreurs, [])
+        ids = [i for liste in obtenues.values() for i in liste]
+        self.assertEqual(len(ids), 120)
+        self.assertEqual(len(set(ids)), 120)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        utilisateur = creer_utilisateur()
+        self.demandes = [creer_demande(utilisateur, date_creation=timezone.now() - timedelta(minutes=10 - i)) for i in range(5)]
+
+    def reserver(self, operateur, nombre, **extra):
+        return client_operateur(operateur).post("/api/reserver/", {"nombre": nombre, **extra},
+                                                content_type="application/json")
+
+    def test_reservation_reservee_aux_admins(self):
+        reponse = self.client.post("/api/reserver/", {"operateur": "op-a", "nombre": 5}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 403)
+        self.assertEqual(self.client.post("/api/liberer/", {"operateur": "op-a"}, content_type="application/json").status_code, 403)
+        self.assertFalse(DemandeTransfert.objects.filter(operateur__isnull=False).exists())
+
+    def test_reservations_distinctes_et_expiration(self):
+        a = [d["id"] for d in self.reserver("op-a", 2).json()["demandes"]]
+        b = [d["id"] for d in self.reserver("op-b", 2, duree=1).json()["demandes"]]
+        self.assertEqual(a, [self.demandes[0].id, self.demandes[1].id])
+        self.assertEqual(b, [self.demandes[2].id, self.demandes[3].id])
+
+        DemandeTransfert.objects.filter(id__in=b).update(bail_expire=timezone.now() - timedelta(seconds=1))
+        c = [d["id"] for d in self.reserver("op-c", 5).json()["demandes"]]
+        self.assertEqual(c, b + [self.demandes[4].id])
+        self.assertEqual(self.reserver("op-d", 1).json()["demandes"], [])
+
+    def test_validation_respecte_le_bail(self):
+        id_demande = self.reserver("op-a", 1).json()["demandes"][0]["id"]
+
+        op_a = client_operateur("op-a")
+        reponse = client_operateur("op-b").post("/api/valider/", {"id_demande": id_demande}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 409)
+        reponse = self.client.post("/api/valider/", {"id_demande": id_demande, "operateur": "op-a"}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 409)
+
+        reponse = op_a.post("/api/valider/", {"id_demande": id_demande}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(DemandeTransfert.objects.get(id=id_demande).operateur, "op-a")
+        reponse = op_a.post("/api/valider/", {"id_demande": id_demande}, content_type="application/json")
+        self.assertEqual(reponse.json()["error"], "Demande déjà traitée.")
+
+        lot = client_operateur("op-b").post("/api/valider_lot/", {"demandes": [
+            {"id_demande": id_demande}, {"id_demande": self.reserver("op-a", 1).json()["demandes"][0]["id"]},
+        ]}, content_type="application/json").json()
+        self.assertEqual([r["resultat"] for r in lot["resultats"]], ["deja_traitee", "reservee"])
+
+    def test_liberation(self):
+        ids = [d["id"] for d in self.reserver("op-a", 3).json()["demandes"]]
+        reponse = client_operateur("op-a").post("/api/liberer/", {"ids": ids[:2]}, content_type="application/json")
+        self.assertEqual(reponse.json()["liberees"], 2)
+        self.assertEqual([d["id"] for d in self.reserver("op-b", 2).json()["demandes"]], ids[:2])
+
+
+class CouloirsReseauTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.utilisateur = creer_utilisateur()
+
+    def soumettre(self, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.post("/api/transfert/", donnees_transfert(self.utilisateur, **extra), content_type="application/json")
+        return DemandeTransfert.objects.get(id=reponse.json()["id_demande"])
+
+    def test_code_ussd_genere_a_la_creation(self):
+        self.assertEqual(self.soumettre(reseau="Orange").code_ussd, "*144*2*1*0101010101*1000#")
+        self.assertIsNone(self.soumettre(numero_destinataire="01*9#").code_ussd)
+        self.assertIsNone(self.soumettre(reseau="wave").code_ussd)
+
+        with override_settings(TRANSFERT_MODELES_USSD={"mtn": "*100*{montant}*{numero_destinataire}#"}):
+            self.assertEqual(self.soumettre(reseau="mtn").code_ussd, "*100*1000*0101010101#")
+
+    def test_couloir_et_version_par_reseau(self):
+        orange = self.soumettre(reseau="orange")
+        self.soumettre(reseau="mtn")
+
+        reponse = self.client.get("/api/demandes_en_attente/orange/")
+        self.assertEqual([d["id"] for d in reponse.json()["results"]], [orange.id])
+        self.assertEqual(reponse.json()["results"][0]["code_ussd"], orange.code_ussd)
+        self.assertEqual(self.client.get("/api/demandes_en_attente/free/").status_code, 404)
+
+        self.soumettre(reseau="mtn")
+        en_tetes = {"If-None-Match": reponse["ETag"]}
+        self.assertEqual(self.client.get("/api/demandes_en_attente/orange/", headers=en_tetes).status_code, 304)
+        self.assertEqual(len(self.client.get("/api/demandes_en_attente/mtn/").json()["results"]), 2)
+
+        reservees = client_operateur("sim-mtn").post("/api/reserver/", {"nombre": 5, "reseau": "MTN"},
+                                                     content_type="application/json").json()["demandes"]
+        self.assertEqual({d["reseau"] for d in reservees}, {"mtn"})
+        self.assertEqual(len(reservees), 2)
+
+
+class PointsTests(TestCase):
+    def setUp(self):
+        self.utilisateur = creer_utilisateur()
+
+    def soumettre(self, jeton=True):
+        en_tetes = {"Authorization": f"Bearer {emettre_jeton(self.utilisateur)}"} if jeton else {}
+        return self.client.post("/api/transfert/", donnees_transfert(self.utilisateur, methode_paiement="points"),
+                                content_type="application/json", headers=en_tetes)
+
+    def test_points_sans_jeton_refuses(self):
+        crediter_points(self.utilisateur.id, 5000)
+        reponse = self.soumettre(jeton=False)
+        self.assertEqual(reponse.status_code, 401)
+        self.utilisateur.refresh_from_db()
+        self.assertEqual(self.utilisateur.solde_points, 5000)
+        self.assertFalse(DemandeTransfert.objects.exists())
+
+    def test_debit_et_solde_insuffisant(self):
+        reponse = self.soumettre()
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(reponse.json()["error"], "Solde de points insuffisant.")
+        self.assertFalse(DemandeTransfert.objects.exists())
+
+        crediter_points(self.utilisateur.id, 1500)
+        self.assertEqual(self.soumettre().status_code, 201)
+        self.assertEqual(self.soumettre().status_code, 400)
+
+        self.utilisateur.refresh_from_db()
+        self.assertEqual(self.utilisateur.solde_points, 500)
+        self.assertEqual(DemandeTransfert.objects.count(), 1)
+        self.assertEqual(list(self.utilisateur.mouvements_points.values_list("type", "montant")),
+                         [("credit", 1500), ("debit", -1000)])
+
+    def test_remboursement_et_reconciliation(self):
+        crediter_points(self.utilisateur.id, 1000)
+        id_demande = self.soumettre().json()["id_demande"]
+        client_operateur("op").post("/api/valider_lot/", {"demandes": [{"id_demande": id_demande, "statut": "echec"}]},
+                                    content_type="application/json")
+
+        self.utilisateur.refresh_from_db()
+        self.assertEqual(self.utilisateur.solde_points, 1000)
+        self.assertEqual(list(verifier_soldes()), [])
+
+        Utilisateur.objects.filter(id=self.utilisateur.id).update(solde_points=42)
+        self.assertEqual(list(verifier_soldes(taille_lot=1, corriger=True)), [(self.utilisateur.id, 42, 1000)])
+        self.assertEqual(list(verifier_soldes()), [])
+
+
+class ImportUtilisateursTests(TestCase):
+    def test_commande_csv(self):
+        creer_utilisateur(numero="0700000001")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("nom_complet,numero,pin\nA,0700000001,1234\nB,0700000002,1234\nC,0700000002,5678\nD,0700000003,12a4\n")
+        self.addCleanup(Path(f.name).unlink)
+
+        sortie, erreurs = io.StringIO(), io.StringIO()
+        call_command("importer_utilisateurs", f.name, "--processus", "1", stdout=sortie, stderr=erreurs)
+        self.assertIn("1 utilisateur(s) créé(s), 2 déjà inscrit(s), 1 invalide(s)", sortie.getvalue())
+        self.assertIn("Ligne 4", erreurs.getvalue())
+        self.assertTrue(check_password("1234", Utilisateur.objects.get(numero="0700000002").code_pin))
+
+    def test_endpoint_admin(self):
+        lignes = [{"nom_complet": "A", "numero": "0700000004", "pin": "4321"}, {"numero": "0700000005"}]
+        self.assertEqual(self.client.post("/api/import/utilisateurs/", lignes, content_type="application/json").status_code, 403)
+
+        connecter_admin(self.client)
+        reponse = self.client.post("/api/import/utilisateurs/", lignes, content_type="application/json").json()
+        self.assertEqual((reponse["crees"], reponse["invalides"][0]["ligne"]), (1, 2))
+        self.assertEqual(reponse["invalides"][0]["error"], "Tous les champs sont requis.")
+
+        fichier = io.BytesIO('{"nom_complet": "A", "numero": "0700000004", "pin": "4321"}\n'.encode())
+        fichier.name = "lot.ndjson"
+        reponse = self.client.post("/api/import/utilisateurs/", {"fichier": fichier}).json()
+        self.assertEqual((reponse["crees"], reponse["deja_inscrits"]), (0, ["0700000004"]))
+
+        inscription = {"nom_complet": "E", "numero": "0700000004", "pin": "1111", "confirmation_pin": "1111"}
+        self.assertEqual(self.client.post("/api/inscription/", inscription, content_type="application/json").status_code, 400)
+
+
+class GenerationDonneesTests(TestCase):
+    def test_donnees_et_mesure_client(self):
+        sortie = io.StringIO()
+        call_command("generer_donnees", "--utilisateurs", "20", "--demandes", "200", "--lot", "50", stdout=sortie)
+        call_command("generer_donnees", "--utilisateurs", "20", "--demandes", "0", stdout=sortie)
+        self.assertEqual(Utilisateur.objects.filter(numero__startswith="06").count(), 20)
+        self.assertEqual(DemandeTransfert.objects.count(), 200)
+        self.assertEqual(sum(CumulJournalier.objects.values_list("nombre", flat=True)), 200)
+
+        mesure = charger_client(self.client, Scenario("liste", "GET", "/api/demandes_en_attente/?limit=5"), 3)
+        self.assertEqual((mesure["requetes"], mesure["erreurs"]), (3, 0))
+
+
+class AuditTests(TestCase):
+    def test_validation_auditee_et_consultable(self):
+        demande = creer_demande(creer_utilisateur())
+        with self.captureOnCommitCallbacks(execute=True):
+            client_operateur("op1").post("/api/valider/", {"id_demande": demande.id, "code_ussd": "*144#"},
+                                         content_type="application/json")
+
+        self.assertEqual(self.client.get("/api/audit/").status_code, 403)
+        connecter_admin(self.client)
+        evenements = self.client.get(f"/api/audit/?id_demande={demande.id}&operateur=op1").json()["results"]
+        self.assertEqual(len(evenements), 1)
+        self.assertEqual(
+            (evenements[0]["ancien_statut"], evenements[0]["statut"], evenements[0]["code_ussd"]),
+            ("en_attente", "valide", "*144#"),
+        )
+        self.assertEqual(self.client.get("/api/audit/?id_demande=x").status_code, 400)
+
+    def test_tampon_vide_par_lot_et_a_l_arret(self):
+        tampon = TamponAudit(taille_lot=3, intervalle=60)
+        tampon.demarrer(fond=False)
+        for _ in range(2):
+            tampon.ajouter(EvenementAudit(id_demande=1, reseau="orange", ancien_statut="en_attente", statut="valide"))
+        self.assertEqual(EvenementAudit.objects.count(), 0)
+
+        for _ in range(2):
+            tampon.ajouter(EvenementAudit(id_demande=1, reseau="orange", ancien_statut="en_attente", statut="valide"))
+        self.assertEqual(EvenementAudit.objects.count(), 3)
+        self.assertEqual(tampon.arreter(), 1)
+        self.assertEqual(EvenementAudit.objects.count(), 4)
+
+
+class AuditFondTests(TransactionTestCase):
+    def test_thread_vide_au_delai(self):
+        tampon = TamponAudit(taille_lot=100, intervalle=0.1)
+        tampon.demarrer()
+        tampon.ajouter(EvenementAudit(id_demande=1, reseau="orange", ancien_statut="en_attente", statut="echec"))
+        limite = time.monotonic() + 5
+        while not EvenementAudit.objects.exists() and time.monotonic() < limite:
+            time.sleep(0.05)
+        tampon.arreter()
+        self.assertEqual(EvenementAudit.objects.count(), 1)
+
+
+class IdempotenceTests(TestCase):
+    def setUp(self):
+        cache_reponses.vider()
+        self.utilisateur = creer_utilisateur()
+
+    def soumettre(self, cle, **extra):
+        return self.client.post("/api/transfert/", donnees_transfert(self.utilisateur, **extra),
+                                content_type="application/json", headers={"Idempotency-Key": cle})
+
+    def test_renvoi_retourne_la_reponse_originale(self):
+        premiere = self.soumettre("cle-1")
+        cache_reponses.vider()  # relu depuis la base, comme sur un autre worker
+        seconde = self.soumettre("cle-1")
+
+        self.assertEqual(seconde.status_code, 201)
+        self.assertEqual(seconde.json(), premiere.json())
+        self.assertEqual(seconde["Idempotent-Replayed"], "true")
+        self.assertEqual(DemandeTransfert.objects.count(), 1)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_meme_cle_autre_contenu(self):
+        self.soumettre("cle-2")
+        self.assertEqual(self.soumettre("cle-2", montant=5000).status_code, 422)
+
+
+class IdempotenceConcurrenceTests(TransactionTestCase):
+    def test_doublons_concurrents_serialises(self):
+        cache_reponses.vider()
+        utilisateur = creer_utilisateur()
+        reponses = []
+
+        def soumettre():
+            try:
+                reponses.append(self.client_class().post(
+                    "/api/transfert/", donnees_transfert(utilisateur),
+                    content_type="application/json", headers={"Idempotency-Key": "cle-concurrente"}
+                ).json())
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=soumettre) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(DemandeTransfert.objects.count(), 1)
+        self.assertEqual(len({r["id_demande"] for r in reponses}), 1)
+
+
+class LimitationPinTests(TestCase):
+    def setUp(self):
+        vider_rejets_locaux()
+        self.utilisateur = creer_utilisateur()
+
+    def deverrouiller(self, pin):
+        return self.client.post("/api/deverrouillage/", {"id_utilisateur": self.utilisateur.id, "pin": pin},
+                                content_type="application/json")
+
+    def test_verrouillage_progressif_avant_hachage(self):
+        for _ in range(5):
+            self.assertEqual(self.deverrouiller("0000").status_code, 401)
+
+        with mock.patch("transfert.authentication.check_password") as check_password:
+            reponse = self.deverrouiller("1234")
+        self.assertEqual(reponse.status_code, 429)
+        self.assertIn("Retry-After", reponse)
+        check_password.assert_not_called()
+
+    def test_ip_du_proxy_et_cache_local_borne(self):
+        requete = RequestFactory().get("/", headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.9"})
+        self.assertEqual(cles_pin(BaseThrottle().get_ident(requete)), ["ip:10.0.0.9"])
+
+        with override_settings(TRANSFERT_PIN_REJETS_LOCAUX_MAX=10):
+            for i in range(25):
+                _memoriser_rejet(f"ip:10.0.1.{i}", 60)
+                self.assertLessEqual(len(_rejets_locaux), 10)
+        self.assertIsNotNone(_rejet_local(["ip:10.0.1.24"]))
+
+    def test_cout_du_rejet_sous_la_milliseconde(self):
+        cles = cles_pin("10.0.0.1", id_utilisateur=self.utilisateur.id)
+        while autoriser(cles) is None:
+            pass
+
+        essais = 1000
+        debut = time.perf_counter()
+        for _ in range(essais):
+            self.assertIsNotNone(autoriser(cles))
+        self.assertLess((time.perf_counter() - debut) / essais, 0.001)
+
+
+class MetriquesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_exposition_prometheus_multi_processus(self):
+        with tempfile.TemporaryDirectory() as dossier, override_settings(METRIQUES_DOSSIER=dossier):
+            Path(dossier, "metriques-999999.json").write_text(json.dumps({
+                "compteurs": [["fcm_messages_total", [["resultat", "succes"]], 3]],
+                "histogrammes": [],
+            }))
+            self.client.get("/api/demandes_en_attente/")
+            texte = self.client.get("/metrics").content.decode()
+
+        self.assertRegex(texte, r'http_requetes_total\{route="api/demandes_en_attente/",methode="GET",code="200"\} [1-9]')
+        self.assertRegex(texte, r'fcm_messages_total\{resultat="succes"\} [3-9]')
+        self.assertRegex(texte, r'sql_requetes_total\{route="api/demandes_en_attente/",methode="GET"\} [1-9]')
+        self.assertIn('http_duree_secondes_bucket{route="api/demandes_en_attente/",methode="GET",le="+Inf"}', texte)
+
+
+class CumulsTests(TestCase):
+    def test_cumuls_incrementaux_et_reconstruction(self):
+        utilisateur = creer_utilisateur()
+        ids = [
+            self.client.post("/api/transfert/", donnees_transfert(utilisateur, montant=montant, reseau=reseau),
+                             content_type="application/json").json()["id_demande"]
+            for montant, reseau in ((1000, "orange"), (500, "orange"), (200, "mtn"))
+        ]
+        connecter_admin(self.client)
+        self.client.post("/api/valider_lot/", [{"id_demande": ids[0]}, {"id_demande": ids[2], "statut": "echec"}],
+                         content_type="application/json")
+        attendu = [
+            {"reseau": "mtn", "statut": "echec", "nombre": 1, "montant_total": "200.00"},
+            {"reseau": "orange", "statut": "en_attente", "nombre": 1, "montant_total": "500.00"},
+            {"reseau": "orange", "statut": "valide", "nombre": 1, "montant_total": "1000.00"},
+        ]
+        stats = self.client.get("/api/statistiques/?groupe_par=reseau,statut").json()
+        self.assertEqual(stats["resultats"], attendu)
+        self.assertEqual(stats["total"], {"nombre": 3, "montant_total": "1700.00"})
+
+        CumulJournalier.objects.update(nombre=0)
+        reconstruire_cumuls()
+        self.assertEqual(self.client.get("/api/statistiques/?groupe_par=reseau,statut").json()["resultats"], attendu)
+
+        par_defaut = self.client.get("/api/statistiques/").json()
+        for groupe_par in ("", ","):
+            self.assertEqual(self.client.get(f"/api/statistiques/?groupe_par={groupe_par}").json(), par_defaut)
+        self.assertEqual(set(par_defaut["resultats"][0]),
+                         {"reseau", "methode_paiement", "statut", "nombre", "montant_total"})
+
+
+class ArchivageTests(TestCase):
+    def test_archivage_par_lots_et_recherche(self):
+        utilisateur = creer_utilisateur()
+        ancien = timezone.now() - timedelta(days=60)
+        anciennes = [creer_demande(utilisateur, statut='valide', date_creation=ancien) for _ in range(5)]
+        en_attente = creer_demande(utilisateur, date_creation=ancien)
+        recente = creer_demande(utilisateur, statut='valide')
+
+        self.assertEqual(archiver_demandes(30, taille_lot=2, pause=0), 5)
+        self.assertCountEqual(DemandeTransfert.objects.values_list("id", flat=True), [en_attente.id, recente.id])
+
+        archivee = trouver_demande(anciennes[0].id)
+        self.assertIsInstance(archivee, DemandeTransfertArchive)
+        self.assertEqual((archivee.statut, archivee.utilisateur_id), ('valide', utilisateur.id))
+
+        reponse = self.client.post("/api/valider/", {"id_demande": anciennes[0].id}, content_type="application/json")
+        self.assertEqual(reponse.status_code, 409)
+
+
+class ExportTests(TestCase):
+    def test_export_filtre_en_flux(self):
+        utilisateur = creer_utilisateur()
+        creer_demande(utilisateur, reseau="orange", statut="valide")
+        creer_demande(utilisateur, reseau="mtn")
+        self.assertEqual(self.client.get("/api/export/demandes/").status_code, 403)
+
+        connecter_admin(self.client)
+        reponse = self.client.get("/api/export/demandes/?type=ndjson&reseau=orange")
+        self.assertTrue(reponse.streaming)
+        lignes = b"".join(reponse.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(l)["reseau"] for l in lignes], ["orange"])
+
+        reponse = self.client.get("/api/export/demandes/?type=csv&gzip=1")
+        contenu = gzip.decompress(b"".join(reponse.streaming_content)).decode().splitlines()
+        self.assertEqual(contenu[0].split(",")[:2], ["id", "utilisateur_id"])
+        self.assertEqual(len(contenu), 3)
+
+    async def test_export_asgi_morceau_par_morceau(self):
+        utilisateur = await Utilisateur.objects.acreate(nom_complet="Test", numero="0700000000", code_pin="x")
+        champs = donnees_transfert(utilisateur)
+        del champs["id_utilisateur"]
+        await DemandeTransfert.objects.abulk_create([DemandeTransfert(utilisateur=utilisateur, **champs) for _ in range(50)])
+        await self.async_client.aforce_login(await User.objects.acreate(username="admin", is_staff=True))
+
+        with mock.patch("transfert.export.TAILLE_MORCEAU", 1024):
+            reponse = await self.async_client.get("/api/export/demandes/?type=ndjson")
+            self.assertTrue(reponse.is_async)
+            morceaux = [morceau async for morceau in reponse]
+        self.assertGreater(len(morceaux), 2)
+        self.assertEqual(len(b"".join(morceaux).decode().splitlines()), 50)
+
+
+class HistoriqueTests(TestCase):
+    def test_historique_pagine_chaud_et_archive(self):
+        utilisateur = creer_utilisateur()
+        autre = creer_utilisateur(numero="0799999999")
+        debut = timezone.now() - timedelta(days=90)
+        demandes = [
+            creer_demande(utilisateur, statut='valide', date_creation=debut + timedelta(days=i)) for i in range(4)
+        ]
+        creer_demande(autre)
+        archiver_demandes(30, pause=0)
+        demandes.append(creer_demande(utilisateur))
+
+        en_tetes = {"Authorization": f"Bearer {emettre_jeton(utilisateur)}"}
+        page = self.client.get("/api/historique/?limit=3", headers=en_tetes).json()
+        suite = self.client.get(f"/api/historique/?limit=3&after={page['next']}", headers=en_tetes).json()
+
+        ids = [d["id"] for d in page["results"] + suite["results"]]
+        self.assertEqual(ids, [d.id for d in reversed(demandes)])
+        self.assertIsNone(suite["next"])
+        self.assertNotIn("numero_wave", page["results"][0])
+        self.assertEqual(self.client.get("/api/historique/").status_code, 401)
@@ -0,0 +1,134 @@
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+from .models import SeauJetons
+
+# ⚡ Rejets déjà connus de ce worker (clé → timestamp de fin) : refus sans requête ni hachage
+_rejets_locaux = {}
+_verrou_local = threading.Lock()
+
+
+def _rejet_local(cles):
+    maintenant = time.time()
+    with _verrou_local:
+        fins = [_rejets_locaux.get(cle, 0) for cle in cles]
+    attente = max(fins) - maintenant
+    return attente if attente > 0 else None
+
+
+def _memoriser_rejet(cle, attente):
+    maintenant = time.time()
+    with _verrou_local:
+        if cle not in _rejets_locaux and len(_rejets_locaux) >= settings.TRANSFERT_PIN_REJETS_LOCAUX_MAX:
+            for c in [c for c, fin in _rejets_locaux.items() if fin <= maintenant]:
+                del _rejets_locaux[c]
+            if len(_rejets_locaux) >= settings.TRANSFERT_PIN_REJETS_LOCAUX_MAX:
+                # Les seaux en base restent la référence : vider ce cache ne fait que coûter une requête
+                _rejets_locaux.clear()
+        _rejets_locaux[cle] = max(_rejets_locaux.get(cle, 0), maintenant + attente)
+
+
+def vider_rejets_locaux():
+    with _verrou_local:
+        _rejets_locaux.clear()
+
+
+def _parametres(cle):
+    if cle.startswith("ip:"):
+        return settings.TRANSFERT_PIN_SEAU_IP
+    return settings.TRANSFERT_PIN_SEAU_COMPTE
+
+
+# 🔹 Clés d'un essai de PIN : l'IP du client et le compte visé
+def cles_pin(ip, numero=None, id_utilisateur=None):
+    cles = [f"ip:{ip}"]
+    if numero:
+        cles.append(f"numero:{numero}")
+    if id_utilisateur:
+        cles.append(f"utilisateur:{id_utilisateur}")
+    return cles
+
+
+# 🪣 Consomme un jeton dans chaque seau ; retourne None si autorisé, sinon l'attente en secondes
+def autoriser(cles):
+    attente = _rejet_local(cles)
+    if attente:
+        return attente
+
+    maintenant = timezone.now()
+    with transaction.atomic():
+        seaux = {s.cle: s for s in SeauJetons.objects.select_for_update().filter(cle__in=cles)}
+        manquantes = [cle for cle in cles if cle not in seaux]
+        if manquantes:
+            # Premier essai sur ces clés : INSERT … ON CONFLICT DO NOTHING puis verrouillage, deux
+            # premiers essais simultanés (PostgreSQL) ne se heurtent plus à la contrainte d'unicité
+            SeauJetons.objects.bulk_create(
+                [SeauJetons(cle=cle, jetons=_parametres(cle)[0], date_maj=maintenant) for cle in manquantes],
+                ignore_conflicts=True,
+            )
+            seaux.update((s.cle, s) for s in SeauJetons.objects.select_for_update().filter(cle__in=manquantes))
+
+        a_enregistrer = []
+        for cle in cles:
+            capacite, par_minute = _parametres(cle)
+            seau = seaux[cle]
+
+            if seau.verrouille_jusqua and seau.verrouille_jusqua > maintenant:
+                attente = (seau.verrouille_jusqua - maintenant).total_seconds()
+                _memoriser_rejet(cle, attente)
+                return attente
+
+            ecoule = max(0, (maintenant - seau.date_maj).total_seconds())
+            seau.jetons = min(capacite, seau.jetons + ecoule * par_minute / 60)
+            seau.date_maj = maintenant
+            if seau.jetons < 1:
+                attente = (1 - seau.jetons) * 60 / par_minute
+                _memoriser_rejet(cle, attente)
+                return attente
+
+            seau.jetons -= 1
+            a_enregistrer.append(seau)
+
+        for seau in a_enregistrer:
+            seau.save()
+    return None
+
+
+# 🔒 PIN incorrect : après N échecs, verrouillage doublé à chaque nouvel échec
+def enregistrer_echec(cles):
+    cles = [cle for cle in cles if not cle.startswith("ip:")]
+    maintenant = timezone.now()
+    with transaction.atomic():
+        for seau in SeauJetons.objects.select_for_update().filter(cle__in=cles):
+            seau.echecs += 1
+            depassement = seau.echecs - settings.TRANSFERT_PIN_ECHECS_AVANT_VERROU
+            if depassement >= 0:
+                duree = min(settings.TRANSFERT_PIN_VERROU_BASE * 2 ** depassement, settings.TRANSFERT_PIN_VERROU_MAX)
+                seau.verrouille_jusqua = maintenant + timedelta(seconds=duree)
+                _memoriser_rejet(seau.cle, duree)
+            seau.save(update_fields=["echecs", "verrouille_jusqua"])
+
+
+def enregistrer_succes(cles):
+    cles = [cle for cle in cles if not cle.startswith("ip:")]
+    SeauJetons.objects.filter(cle__in=cles, echecs__gt=0).update(echecs=0, verrouille_jusqua=None)
+
+
+# 📌 Throttle DRF des vues PIN : vérifié avant tout hachage (dans APIView.initial)
+class PinThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        request.cles_pin = cles_pin(
+            self.get_ident(request),
+            numero=request.data.get("numero"),
+            id_utilisateur=request.data.get("id_utilisateur"),
+        )
+        self.attente = autoriser(request.cles_pin)
+        return self.attente is None
+
+    def wait(self):
+        return math.ceil(self.attente)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 # 📌 Importation depuis les fichiers séparés
@@ -9,14 +10,34 @@ from .views.auth_views import (
 
 from .views.transfert_views import (
     SoumissionTransfertView,
-    ValidationDemandeView
+    ValidationDemandeView,
+    ValidationLotView,
+    ReservationView,
+    LiberationView,
+    HistoriqueView
 )
 
 from .views.admin_views import (
     EnregistrerTokenAdminView,
-    DemandesEnAttenteView
+    DemandesEnAttenteView,
+    StatistiquesView,
+    ExportDemandesView,
+    ImportUtilisateursView,
+    AuditView
 )
 
+from .views.flux_views import FluxDemandesView, StatutDemandesView
+
+# ⚡ Sous ASGI (TRANSFERT_VUES_ASYNC=1), mêmes routes servies par les vues async
+if settings.TRANSFERT_VUES_ASYNC:
+    from .views.async_views import (
+        ConnexionAsyncView as ConnexionView,
+        DeverrouillageAsyncView as DeverrouillageView,
+        SoumissionTransfertAsyncView as SoumissionTransfertView,
+        ValidationDemandeAsyncView as ValidationDemandeView,
+        DemandesEnAttenteAsyncView as DemandesEnAttenteView,
+    )
+
 urlpatterns = [
     # 🔹 Authentification
     path('inscription/', InscriptionView.as_view(), name='inscription'),
@@ -26,9 +47,20 @@ urlpatterns = [
     # 🔹 Transfert
     path('transfert/', SoumissionTransfertView.as_view(), name='soumission_transfert'),
     path('valider/', ValidationDemandeView.as_view(), name='valider_demande'),
+    path('valider_lot/', ValidationLotView.as_view(), name='valider_lot'),
+    path('reserver/', ReservationView.as_view(), name='reserver'),
+    path('liberer/', LiberationView.as_view(), name='liberer'),
+    path('historique/', HistoriqueView.as_view(), name='historique'),
+    path('statut_demandes/', StatutDemandesView.as_view(), name='statut_demandes'),
 
     # 🔹 Admin
     path('demandes/', DemandesEnAttenteView.as_view(), name='demandes'),  
     path('demandes_en_attente/', DemandesEnAttenteView.as_view(), name='demandes_en_attente'),
+    path('demandes_en_attente/<str:reseau>/', DemandesEnAttenteView.as_view(), name='demandes_en_attente_reseau'),
     path('enregistrer_token_admin/', EnregistrerTokenAdminView.as_view(), name='enregistrer_token_admin'),
+    path('flux/demandes/', FluxDemandesView.as_view(), name='flux_demandes'),
+    path('statistiques/', StatistiquesView.as_view(), name='statistiques'),
+    path('export/demandes/', ExportDemandesView.as_view(), name='export_demandes'),
+    path('import/utilisateurs/', ImportUtilisateursView.as_view(), name='import_utilisateurs'),
+    path('audit/', AuditView.as_view(), name='audit'),
 ]
@@ -0,0 +1,62 @@
+import threading
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# 📞 Génération du code USSD par réseau (TRANSFERT_MODELES_USSD), au moment de la création de la demande.
+#    Chaque entrée est soit un modèle str.format ({numero_destinataire}, {montant}, {reseau}),
+#    soit le chemin d'une fonction `f(demande) -> str` pour les réseaux aux menus plus complexes.
+_generateurs = {}
+_verrou = threading.Lock()
+
+
+class ModeleUSSD:
+    def __init__(self, modele):
+        self.modele = modele
+
+    def __call__(self, demande):
+        # Le code est composé sans relecture : un numéro contenant * ou # changerait le menu parcouru
+        numero = demande.numero_destinataire.replace(" ", "")
+        if not numero.isdigit():
+            return None
+        return self.modele.format(
+            numero_destinataire=numero,
+            montant=int(demande.montant),
+            reseau=demande.reseau,
+        )
+
+
+def _construire(valeur):
+    if callable(valeur):
+        return valeur
+    if "{" in valeur or "#" in valeur:
+        return ModeleUSSD(valeur)
+    return import_string(valeur)
+
+
+def obtenir_generateur(reseau):
+    with _verrou:
+        if reseau not in _generateurs:
+            valeur = settings.TRANSFERT_MODELES_USSD.get(reseau)
+            _generateurs[reseau] = _construire(valeur) if valeur else None
+        return _generateurs[reseau]
+
+
+# 🔌 Branche un générateur à l'exécution (tests, intégration d'un nouvel opérateur télécom)
+def enregistrer_generateur(reseau, generateur):
+    with _verrou:
+        _generateurs[reseau] = _construire(generateur)
+
+
+# 🔹 Code à composer pour cette demande, ou None si le réseau n'a pas de modèle (saisie manuelle)
+def generer_code_ussd(demande):
+    generateur = obtenir_generateur(demande.reseau)
+    return generateur(demande) if generateur else None
+
+
+@receiver(setting_changed)
+def vider_generateurs(setting, **kwargs):
+    if setting == "TRANSFERT_MODELES_USSD":
+        with _verrou:
+            _generateurs.clear()
@@ -1,26 +1,191 @@
-import os
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from django.conf import settings
-from ..models import DemandeTransfert
-from ..serializers import DemandeTransfertSerializer
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from ..models import DemandeTransfert, CumulJournalier, EvenementAudit
+from ..serializers import DemandeTransfertSerializer, ProjectionInvalide, lire_projection
+from ..pagination import PageKeyset, CurseurInvalide
+from ..cache_demandes import PageEnCache, version_file
+from ..inscriptions import LECTEURS, importer_utilisateurs, lire_fichier
+from ..export import FORMATS, FiltreInvalide, construire_filtres, exporter, exporter_async
+from .fcm_utils import enregistrer_token_admin
 
-TOKEN_FILE_PATH = os.path.join(settings.BASE_DIR, "token_admin.txt")
-
-# 📌 Enregistrement du token admin
+# 📌 Enregistrement du token admin (un par appareil opérateur) : les notifications contiennent
+#    montants et numéros, seul un compte admin peut ajouter un appareil destinataire
 class EnregistrerTokenAdminView(APIView):
+    permission_classes = [IsAdminUser]
+
     def post(self, request):
         token = request.data.get("token")
         if not token:
             return Response({"error": "Token manquant"}, status=400)
 
-        with open(TOKEN_FILE_PATH, "w") as f:
-            f.write(token.strip())
+        enregistrer_token_admin(token.strip())
 
         return Response({"message": "Token enregistré avec succès"})
 
-# 📡 Liste demandes en attente
+# 📡 Liste demandes en attente (pagination keyset, ?since= pour ne récupérer que les nouvelles,
+#    ?fields= pour une projection) : lignes .values() rendues telles quelles, sans serializer.
+#    /demandes_en_attente/<reseau>/ : couloir d'un seul réseau, avec sa propre version de cache.
+#    Page en cache par version de la file ; If-None-Match → 304 sans requête SQL
 class DemandesEnAttenteView(ListAPIView):
-    queryset = DemandeTransfert.objects.filter(statut='en_attente').order_by('-date_creation')
+    queryset = DemandeTransfert.objects.filter(statut='en_attente')
     serializer_class = DemandeTransfertSerializer
+
+    def get_queryset(self):
+        reseau = self.kwargs.get('reseau')
+        return super().get_queryset().filter(reseau=reseau) if reseau else super().get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        reseau = kwargs.get('reseau')
+        if reseau is not None and reseau not in settings.TRANSFERT_RESEAUX:
+            return Response({"error": "Réseau inconnu."}, status=404)
+
+        en_cache = PageEnCache(request, version_file(reseau))
+        if en_cache.non_modifiee:
+            return Response(status=304, headers=en_cache.en_tetes())
+
+        contenu = en_cache.lire()
+        if contenu is None:
+            try:
+                page = PageKeyset(request)
+                champs = lire_projection(request.query_params)
+            except (CurseurInvalide, ProjectionInvalide) as e:
+                return Response({"error": str(e)}, status=400)
+
+            contenu = page.reponse(page.paginer(self.get_queryset().values(*champs)))
+            en_cache.ecrire(contenu)
+        return Response(contenu, headers=en_cache.en_tetes())
+
+
+# 📈 Statistiques de volume, lues dans les cumuls journaliers (indépendant de la taille de l'historique)
+#    ?date_debut=AAAA-MM-JJ&date_fin=…&reseau=…&methode_paiement=…&statut=…&groupe_par=jour,reseau
+class StatistiquesView(APIView):
+    permission_classes = [IsAdminUser]
+    GROUPES = ('jour', 'reseau', 'methode_paiement', 'statut')
+    GROUPES_DEFAUT = ('reseau', 'methode_paiement', 'statut')
+
+    def get(self, request):
+        params = request.query_params
+        cumuls = CumulJournalier.objects.all()
+
+        for param, filtre in (('date_debut', 'jour__gte'), ('date_fin', 'jour__lte')):
+            if params.get(param):
+                jour = parse_date(params[param]) if len(params[param]) == 10 else None
+                if jour is None:
+                    return Response({"error": f"{param} invalide (AAAA-MM-JJ)."}, status=400)
+                cumuls = cumuls.filter(**{filtre: jour})
+
+        for champ in ('reseau', 'methode_paiement', 'statut'):
+            if params.get(champ):
+                cumuls = cumuls.filter(**{champ: params[champ].lower()})
+
+        # groupe_par absent ou vide : regroupement par défaut (jamais les lignes brutes des cumuls)
+        groupes = [g for g in params.get('groupe_par', '').split(',') if g] or list(self.GROUPES_DEFAUT)
+        if any(g not in self.GROUPES for g in groupes):
+            return Response({"error": f"groupe_par accepte : {', '.join(self.GROUPES)}."}, status=400)
+
+        resultats = (
+            cumuls.values(*groupes)
+            .annotate(nombre=Sum('nombre'), montant_total=Sum('montant_total'))
+            .order_by(*groupes)
+        )
+        total = cumuls.aggregate(nombre=Sum('nombre'), montant_total=Sum('montant_total'))
+
+        return Response({
+            "resultats": [
+                {**ligne, "montant_total": f"{ligne['montant_total']:.2f}"}
+                for ligne in resultats if ligne["nombre"]
+            ],
+            "total": {"nombre": total["nombre"] or 0, "montant_total": f"{total['montant_total'] or 0:.2f}"},
+        })
+
+
+# 📤 Export comptable en flux : ?type=csv|ndjson&gzip=1&date_debut=…&date_fin=…&reseau=…&statut=…
+class ExportDemandesView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        type_fichier = params.get('type', 'csv')
+        if type_fichier not in FORMATS:
+            return Response({"error": "type accepte : csv, ndjson."}, status=400)
+
+        try:
+            filtres = construire_filtres(params.get('date_debut'), params.get('date_fin'), params.get('reseau'), params.get('statut'))
+        except FiltreInvalide as e:
+            return Response({"error": str(e)}, status=400)
+
+        gzip = params.get('gzip') == '1'
+        nom = f"demandes.{type_fichier}" + (".gz" if gzip else "")
+        morceaux = exporter(type_fichier, filtres, gzip)
+        if isinstance(request._request, ASGIRequest):
+            morceaux = exporter_async(morceaux)
+        reponse = StreamingHttpResponse(
+            morceaux,
+            content_type="application/gzip" if gzip else FORMATS[type_fichier][1]
+        )
+        reponse["Content-Disposition"] = f'attachment; filename="{nom}"'
+        return reponse
+
+
+# 👥 Import en masse d'utilisateurs (admin) : liste JSON, ou fichier multipart `fichier` (?type=csv|ndjson).
+#    Mêmes règles que /api/inscription/ ; PIN hachés en parallèle (PBKDF2 relâche le GIL).
+#    Pour de gros volumes : manage.py importer_utilisateurs
+class ImportUtilisateursView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        if isinstance(request.data, list):
+            lignes = request.data
+        elif 'fichier' in request.FILES:
+            fichier = request.FILES['fichier']
+            type_fichier = request.query_params.get('type') or Path(fichier.name).suffix.lstrip('.').lower()
+            if type_fichier not in LECTEURS:
+                return Response({"error": f"type accepte : {', '.join(sorted(LECTEURS))}."}, status=400)
+            try:
+                lignes = list(lire_fichier(fichier.read(), type_fichier))
+            except (UnicodeDecodeError, csv.Error):
+                return Response({"error": "Fichier illisible."}, status=400)
+        else:
+            return Response({"error": "Liste JSON ou fichier requis."}, status=400)
+
+        if len(lignes) > settings.TRANSFERT_IMPORT_MAX:
+            return Response({"error": f"Maximum {settings.TRANSFERT_IMPORT_MAX} utilisateurs par appel."}, status=400)
+
+        with ThreadPoolExecutor(max_workers=settings.TRANSFERT_THREADS_HACHAGE, thread_name_prefix="import-pin") as pool:
+            resultat = importer_utilisateurs(lignes, pool)
+        return Response(resultat.en_dict())
+
+
+# 🧾 Journal d'audit des statuts : ?id_demande=…&operateur=…&statut=…&reseau=…&date_debut=…&date_fin=…
+#    Pagination keyset (limit, after, since). Écriture différée : jusqu'à TRANSFERT_AUDIT_INTERVALLE s de retard.
+class AuditView(APIView):
+    permission_classes = [IsAdminUser]
+    CHAMPS = ('id', 'id_demande', 'reseau', 'ancien_statut', 'statut', 'operateur', 'code_ussd', 'date_creation')
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            page = PageKeyset(request)
+            filtres = construire_filtres(params.get('date_debut'), params.get('date_fin'), params.get('reseau'), params.get('statut'))
+        except (CurseurInvalide, FiltreInvalide) as e:
+            return Response({"error": str(e)}, status=400)
+
+        if params.get('id_demande'):
+            if not params['id_demande'].isdigit():
+                return Response({"error": "id_demande invalide."}, status=400)
+            filtres['id_demande'] = int(params['id_demande'])
+        if params.get('operateur'):
+            filtres['operateur'] = params['operateur']
+
+        evenements = page.paginer(EvenementAudit.objects.filter(**filtres).values(*self.CHAMPS))
+        return Response(page.reponse(evenements))
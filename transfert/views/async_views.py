@@ -0,0 +1,209 @@
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import BaseThrottle
+from ..models import Utilisateur, DemandeTransfert
+from ..serializers import ProjectionInvalide, lire_projection
+from ..renderers import JSONRapideRenderer
+from ..cache_demandes import PageEnCache, aversion_file
+from ..pagination import PageKeyset, CurseurInvalide
+from ..authentication import verifier_jeton, verifier_pin, reponse_jeton
+from ..throttling import cles_pin, autoriser, enregistrer_echec, enregistrer_succes
+from .transfert_views import ErreurDemande, lire_soumission, soumettre_demande, en_tetes_idempotence, valider_demande, nom_operateur
+
+# ⚙️ Pool borné pour le hachage PIN : le PBKDF2 ne bloque jamais la boucle d'événements
+_pool_hachage = ThreadPoolExecutor(max_workers=settings.TRANSFERT_THREADS_HACHAGE, thread_name_prefix="hachage-pin")
+
+
+async def verifier_pin_async(utilisateur, pin, cles):
+    valide = await asyncio.get_running_loop().run_in_executor(_pool_hachage, verifier_pin, utilisateur, pin)
+    await sync_to_async(enregistrer_succes if valide else enregistrer_echec)(cles)
+    return valide
+
+
+# 🪣 Même limitation que PinThrottle, avant tout hachage
+async def limiter_pin(request, **ident):
+    cles = cles_pin(BaseThrottle().get_ident(request), **ident)
+    attente = await sync_to_async(autoriser)(cles)
+    if attente is None:
+        return cles, None
+
+    reponse = JsonResponse({"detail": f"Trop de tentatives. Réessayer dans {math.ceil(attente)} secondes."}, status=429)
+    reponse["Retry-After"] = str(math.ceil(attente))
+    return cles, reponse
+
+
+def lire_json(request):
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+
+
+def id_depuis_jeton(request):
+    auth = request.headers.get("Authorization", "").split()
+    if len(auth) == 2 and auth[0].lower() == "bearer":
+        return verifier_jeton(auth[1]), True
+    return None, False
+
+
+# 🔹 Opérateur authentifié (session, ou Basic comme les APIView DRF) ; None pour un client anonyme
+async def operateur_async(request):
+    if hasattr(request, "auser"):
+        utilisateur = await request.auser()
+        if utilisateur.is_authenticated:
+            return nom_operateur(utilisateur)
+    try:
+        resultat = await sync_to_async(BasicAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return nom_operateur(resultat[0]) if resultat else None
+
+
+# 🔹 Vue async sans CSRF (comme les APIView DRF des versions sync)
+class VueAsync(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+
+# 🔐 API de connexion (async)
+class ConnexionAsyncView(VueAsync):
+    async def post(self, request):
+        data = lire_json(request)
+        if data is None:
+            return JsonResponse({"error": "JSON invalide."}, status=400)
+
+        numero = data.get('numero')
+        pin = data.get('pin')
+        if not numero or not pin:
+            return JsonResponse({"error": "Numéro et PIN requis."}, status=400)
+
+        cles, refus = await limiter_pin(request, numero=numero)
+        if refus:
+            return refus
+
+        try:
+            utilisateur = await Utilisateur.objects.aget(numero=numero)
+        except Utilisateur.DoesNotExist:
+            return JsonResponse({"error": "Utilisateur introuvable."}, status=404)
+
+        if not await verifier_pin_async(utilisateur, pin, cles):
+            return JsonResponse({"error": "Code PIN incorrect."}, status=401)
+
+        return JsonResponse({
+            "message": "Connexion réussie.",
+            "id": utilisateur.id,
+            "nom": utilisateur.nom_complet,
+            **reponse_jeton(utilisateur)
+        })
+
+
+# 🔓 API de déverrouillage (async)
+class DeverrouillageAsyncView(VueAsync):
+    async def post(self, request):
+        data = lire_json(request)
+        if data is None:
+            return JsonResponse({"error": "JSON invalide."}, status=400)
+
+        id_utilisateur = data.get('id_utilisateur')
+        pin = data.get('pin')
+        if not id_utilisateur or not pin:
+            return JsonResponse({"error": "ID utilisateur et PIN requis."}, status=400)
+
+        cles, refus = await limiter_pin(request, id_utilisateur=id_utilisateur)
+        if refus:
+            return refus
+
+        try:
+            utilisateur = await Utilisateur.objects.aget(id=id_utilisateur)
+        except (Utilisateur.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Utilisateur introuvable."}, status=404)
+
+        if not await verifier_pin_async(utilisateur, pin, cles):
+            return JsonResponse({"error": "Code PIN incorrect."}, status=401)
+
+        return JsonResponse({"message": "Déverrouillage réussi.", **reponse_jeton(utilisateur)})
+
+
+# 📨 Soumission d'une demande de transfert (async)
+class SoumissionTransfertAsyncView(VueAsync):
+    async def post(self, request):
+        id_jeton, jeton_present = id_depuis_jeton(request)
+        if jeton_present and id_jeton is None:
+            return JsonResponse({"detail": "Jeton invalide ou expiré."}, status=401)
+
+        data = lire_json(request)
+        if data is None:
+            return JsonResponse({"error": "JSON invalide."}, status=400)
+
+        try:
+            champs = lire_soumission(data, id_jeton)
+        except ErreurDemande as e:
+            return JsonResponse({"error": e.message}, status=e.code)
+
+        try:
+            utilisateur = await Utilisateur.objects.aget(id=champs["id_utilisateur"])
+        except (Utilisateur.DoesNotExist, ValueError):
+            return JsonResponse({"error": "Utilisateur introuvable."}, status=404)
+
+        # L'ORM async ne gère pas les transactions : insertion + outbox dans un thread
+        try:
+            code_http, reponse, rejouee = await sync_to_async(soumettre_demande)(
+                utilisateur, champs, request.headers.get('Idempotency-Key')
+            )
+        except ErreurDemande as e:
+            return JsonResponse({"error": e.message}, status=e.code)
+
+        return JsonResponse(reponse, status=code_http, headers=en_tetes_idempotence(rejouee))
+
+
+# ✅ Validation demande (async)
+class ValidationDemandeAsyncView(VueAsync):
+    async def post(self, request):
+        data = lire_json(request)
+        if data is None:
+            return JsonResponse({"error": "JSON invalide."}, status=400)
+
+        try:
+            await sync_to_async(valider_demande)(data.get('id_demande'), data.get('code_ussd', None), await operateur_async(request))
+        except ErreurDemande as e:
+            return JsonResponse({"error": e.message}, status=e.code)
+
+        return JsonResponse({"message": "Demande validée avec succès."})
+
+
+# 📡 Liste demandes en attente (async, même format, mêmes couloirs et même cache que la vue sync)
+class DemandesEnAttenteAsyncView(VueAsync):
+    async def get(self, request, reseau=None):
+        if reseau is not None and reseau not in settings.TRANSFERT_RESEAUX:
+            return JsonResponse({"error": "Réseau inconnu."}, status=404)
+
+        en_cache = PageEnCache(request, await aversion_file(reseau))
+        if en_cache.non_modifiee:
+            return HttpResponse(status=304, headers=en_cache.en_tetes())
+
+        contenu = await en_cache.alire()
+        if contenu is None:
+            try:
+                page = PageKeyset(request)
+                champs = lire_projection(request.GET)
+            except (CurseurInvalide, ProjectionInvalide) as e:
+                return JsonResponse({"error": str(e)}, status=400)
+
+            demandes = DemandeTransfert.objects.filter(statut='en_attente')
+            if reseau:
+                demandes = demandes.filter(reseau=reseau)
+            contenu = page.reponse(await page.apaginer(demandes.values(*champs)))
+            await en_cache.aecrire(contenu)
+        return HttpResponse(
+            JSONRapideRenderer().render(contenu), content_type="application/json", headers=en_cache.en_tetes()
+        )
@@ -1,37 +1,27 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.hashers import make_password
 from ..models import Utilisateur
+from ..authentication import verifier_pin, reponse_jeton
+from ..inscriptions import InscriptionInvalide, valider_inscription
+from ..throttling import PinThrottle, enregistrer_echec, enregistrer_succes
 
 # 📦 API d'inscription
 class InscriptionView(APIView):
     def post(self, request):
-        data = request.data
-        nom_complet = data.get('nom_complet')
-        numero = data.get('numero')
-        pin = data.get('pin')
-        confirmation_pin = data.get('confirmation_pin')
-
-        if not nom_complet or not numero or not pin or not confirmation_pin:
-            return Response({"error": "Tous les champs sont requis."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not pin.isdigit():
-            return Response({"error": "Le code PIN doit contenir uniquement des chiffres."}, status=400)
-
-        if len(pin) != 4:
-            return Response({"error": "Le code PIN doit contenir exactement 4 chiffres."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if pin != confirmation_pin:
-            return Response({"error": "Les deux codes PIN ne correspondent pas."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            champs = valider_inscription(request.data)
+        except InscriptionInvalide as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if Utilisateur.objects.filter(numero=numero).exists():
+        if Utilisateur.objects.filter(numero=champs["numero"]).exists():
             return Response({"error": "Ce numéro est déjà inscrit."}, status=status.HTTP_400_BAD_REQUEST)
 
         utilisateur = Utilisateur.objects.create(
-            nom_complet=nom_complet,
-            numero=numero,
-            code_pin=make_password(pin)
+            nom_complet=champs["nom_complet"],
+            numero=champs["numero"],
+            code_pin=make_password(champs["pin"])
         )
 
         return Response({"message": "Inscription réussie !", "id": utilisateur.id}, status=status.HTTP_201_CREATED)
@@ -39,6 +29,8 @@ class InscriptionView(APIView):
 
 # 🔐 API de connexion
 class ConnexionView(APIView):
+    throttle_classes = [PinThrottle]
+
     def post(self, request):
         data = request.data
         numero = data.get('numero')
@@ -52,14 +44,24 @@ class ConnexionView(APIView):
         except Utilisateur.DoesNotExist:
             return Response({"error": "Utilisateur introuvable."}, status=status.HTTP_404_NOT_FOUND)
 
-        if not check_password(pin, utilisateur.code_pin):
+        if not verifier_pin(utilisateur, pin):
+            enregistrer_echec(request.cles_pin)
             return Response({"error": "Code PIN incorrect."}, status=status.HTTP_401_UNAUTHORIZED)
 
-        return Response({"message": "Connexion réussie.", "id": utilisateur.id, "nom": utilisateur.nom_complet}, status=status.HTTP_200_OK)
+        enregistrer_succes(request.cles_pin)
+
+        return Response({
+            "message": "Connexion réussie.",
+            "id": utilisateur.id,
+            "nom": utilisateur.nom_complet,
+            **reponse_jeton(utilisateur)
+        }, status=status.HTTP_200_OK)
 
 
 # 🔓 API de déverrouillage
 class DeverrouillageView(APIView):
+    throttle_classes = [PinThrottle]
+
     def post(self, request):
         data = request.data
         id_utilisateur = data.get('id_utilisateur')
@@ -73,7 +75,11 @@ class DeverrouillageView(APIView):
         except Utilisateur.DoesNotExist:
             return Response({"error": "Utilisateur introuvable."}, status=status.HTTP_404_NOT_FOUND)
 
-        if not check_password(pin, utilisateur.code_pin):
+        if not verifier_pin(utilisateur, pin):
+            enregistrer_echec(request.cles_pin)
             return Response({"error": "Code PIN incorrect."}, status=status.HTTP_401_UNAUTHORIZED)
 
-        return Response({"message": "Déverrouillage réussi."}, status=status.HTTP_200_OK)
+        enregistrer_succes(request.cles_pin)
+
+        # 🔄 Jeton renouvelé à chaque déverrouillage
+        return Response({"message": "Déverrouillage réussi.", **reponse_jeton(utilisateur)}, status=status.HTTP_200_OK)
@@ -1,48 +1,100 @@
 import os
+import time
 import logging
-from pathlib import Path
+import threading
 from django.conf import settings
-import firebase_admin
-from firebase_admin import credentials, messaging
+from ..models import TokenAdmin
 
 logger = logging.getLogger(__name__)
 
-TOKEN_FILE_PATH = os.path.join(settings.BASE_DIR, "token_admin.txt")
-
-# 🔹 Initialisation Firebase
-try:
-    cred_path = os.environ.get(
-        "GOOGLE_APPLICATION_CREDENTIALS",
-        os.path.join(settings.BASE_DIR, "backendorhelo/firebase-key.json")
-    )
-
-    if not firebase_admin._apps:
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-except Exception as e:
-    logger.error(f"Erreur initialisation Firebase : {e}")
-
-# 🔹 Envoi de notification à l'admin
-def envoyer_notification_fcm(titre, corps):
-    try:
-        token_path = Path(TOKEN_FILE_PATH)
-        if not token_path.exists():
-            logger.warning("Aucun token admin enregistré")
-            return
-
-        with open(token_path, "r") as f:
-            token_admin = f.read().strip()
-
-        message = messaging.Message(
+# 📌 Limite Firebase du nombre de tokens par envoi multicast
+TAILLE_MAX_MULTICAST = 500
+
+# 🔹 Initialisation Firebase au premier envoi (ni import du SDK ni lecture de la clé au démarrage
+#    des workers). En cas d'échec rien n'est mémorisé : l'envoi suivant réessaie.
+_app_firebase = None
+_verrou_firebase = threading.Lock()
+
+
+def obtenir_app_firebase():
+    global _app_firebase
+    if _app_firebase is None:
+        with _verrou_firebase:
+            if _app_firebase is None:
+                import firebase_admin
+                from firebase_admin import credentials
+
+                if firebase_admin._apps:
+                    _app_firebase = firebase_admin.get_app()
+                else:
+                    cred_path = os.environ.get(
+                        "GOOGLE_APPLICATION_CREDENTIALS",
+                        os.path.join(settings.BASE_DIR, "backendorhelo/firebase-key.json")
+                    )
+                    _app_firebase = firebase_admin.initialize_app(credentials.Certificate(cred_path))
+    return _app_firebase
+
+
+# 🔹 Cache en mémoire des tokens actifs (invalidé à l'enregistrement, TTL pour les autres workers)
+_cache_tokens = {"tokens": None, "expire": 0.0}
+_verrou_cache = threading.Lock()
+
+
+def invalider_cache_tokens():
+    with _verrou_cache:
+        _cache_tokens["tokens"] = None
+
+
+def lire_tokens_admin():
+    with _verrou_cache:
+        if _cache_tokens["tokens"] is not None and time.monotonic() < _cache_tokens["expire"]:
+            return _cache_tokens["tokens"]
+
+    tokens = list(TokenAdmin.objects.filter(actif=True).values_list("token", flat=True))
+
+    with _verrou_cache:
+        _cache_tokens["tokens"] = tokens
+        _cache_tokens["expire"] = time.monotonic() + settings.FCM_CACHE_TOKENS_TTL
+    return tokens
+
+
+# 🔹 Enregistrement (ou réactivation) du token d'un appareil opérateur
+def enregistrer_token_admin(token):
+    TokenAdmin.objects.update_or_create(token=token, defaults={"actif": True})
+    invalider_cache_tokens()
+
+
+# 🔹 Désactivation des tokens que Firebase ne reconnaît plus
+def desactiver_tokens(tokens):
+    if not tokens:
+        return
+    TokenAdmin.objects.filter(token__in=tokens).update(actif=False)
+    invalider_cache_tokens()
+    logger.info(f"{len(tokens)} token(s) admin désactivé(s)")
+
+
+def tokens_invalides(tokens, reponse):
+    from firebase_admin import messaging
+
+    return [
+        token for token, r in zip(tokens, reponse.responses)
+        if not r.success and isinstance(r.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError))
+    ]
+
+
+# 🔹 Envoi multicast à tous les appareils (par paquets de 500 tokens)
+def envoyer_messages_fcm(titre, corps, tokens):
+    from firebase_admin import messaging
+
+    app = obtenir_app_firebase()
+    reponses = []
+    for debut in range(0, len(tokens), TAILLE_MAX_MULTICAST):
+        message = messaging.MulticastMessage(
             notification=messaging.Notification(
                 title=titre,
                 body=corps
             ),
-            token=token_admin
+            tokens=tokens[debut:debut + TAILLE_MAX_MULTICAST]
         )
-
-        response = messaging.send(message)
-        logger.info(f"Notification envoyée : {response}")
-
-    except Exception as e:
-        logger.error(f"Erreur envoi FCM : {e}")
+        reponses.extend(messaging.send_each_for_multicast(message, app=app).responses)
+    return messaging.BatchResponse(reponses)
@@ -0,0 +1,122 @@
+import json
+import math
+import time
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from ..evenements import obtenir_bus, TYPES_STATUT
+from ..models import DemandeTransfert, DemandeTransfertArchive
+from .async_views import VueAsync, id_depuis_jeton, operateur_async
+
+
+def formater_sse(evenement):
+    return f"id: {evenement.id}\nevent: {evenement.type}\ndata: {json.dumps(evenement.donnees)}\n\n"
+
+
+# 📡 Flux temps réel des demandes (Server-Sent Events) : une connexion par opérateur
+#    remplace le polling de /api/demandes_en_attente/. Réservé aux comptes admin (numéros et
+#    montants de chaque demande). Nécessite un serveur ASGI, et un seul worker tant que le bus
+#    est en mémoire (voir BusEnMemoire).
+class FluxDemandesView(View):
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"error": "Flux disponible uniquement sous ASGI."}, status=501)
+        if await operateur_async(request) is None:
+            return JsonResponse({"error": "Compte admin requis."}, status=403)
+
+        dernier_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        bus = obtenir_bus()
+        try:
+            abonnement, a_rejouer = bus.abonner(dernier_id or None)
+        except ValueError:
+            return JsonResponse({"error": "Last-Event-ID invalide."}, status=400)
+
+        async def flux():
+            try:
+                yield f"retry: {settings.TRANSFERT_SSE_RETRY_MS}\n\n"
+
+                # 🔁 Historique trop court : le client doit recharger la liste complète
+                if a_rejouer is None:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    for evenement in a_rejouer:
+                        yield formater_sse(evenement)
+
+                while True:
+                    evenement = await abonnement.suivant(settings.TRANSFERT_SSE_HEARTBEAT)
+                    yield formater_sse(evenement) if evenement else ": ping\n\n"
+            finally:
+                bus.desabonner(abonnement)
+
+        reponse = StreamingHttpResponse(flux(), content_type="text/event-stream")
+        reponse["Cache-Control"] = "no-cache"
+        reponse["X-Accel-Buffering"] = "no"
+        return reponse
+
+
+# 🔹 Statuts actuels des demandes `ids` de l'utilisateur (table chaude, puis archive pour les manquantes)
+async def lire_statuts(id_utilisateur, ids):
+    statuts = {}
+    for modele in (DemandeTransfert, DemandeTransfertArchive):
+        manquantes = [i for i in ids if i not in statuts]
+        if not manquantes:
+            break
+        lignes = modele.objects.filter(utilisateur_id=id_utilisateur, id__in=manquantes).values_list('id', 'statut')
+        async for id, statut in lignes:
+            statuts[id] = statut
+    return statuts
+
+
+# ⏳ Long-poll du statut de ses demandes : ?ids=12,13&statut=en_attente&timeout=25
+#    Répond dès qu'une demande n'a plus le statut connu du client, sinon à l'expiration du délai.
+#    Réveil par le bus d'événements du processus ; relecture en base toutes les
+#    TRANSFERT_STATUT_RELECTURE secondes pour les validations passées par un autre worker.
+#    Sous WSGI, réponse immédiate (un worker sync ne doit pas rester bloqué).
+class StatutDemandesView(VueAsync):
+    async def get(self, request):
+        id_utilisateur, jeton_present = id_depuis_jeton(request)
+        if id_utilisateur is None:
+            return JsonResponse(
+                {"detail": "Jeton invalide ou expiré." if jeton_present else "Jeton requis."}, status=401
+            )
+
+        try:
+            ids = list(dict.fromkeys(int(i) for i in request.GET.get("ids", "").split(",") if i.strip()))
+            timeout = float(request.GET.get("timeout", settings.TRANSFERT_STATUT_ATTENTE_MAX))
+        except ValueError:
+            return JsonResponse({"error": "ids et timeout doivent être numériques."}, status=400)
+        if not math.isfinite(timeout):
+            # nan traverserait min/max sans jamais expirer
+            return JsonResponse({"error": "timeout invalide."}, status=400)
+        if not ids or len(ids) > settings.TRANSFERT_STATUT_IDS_MAX:
+            return JsonResponse({"error": f"Entre 1 et {settings.TRANSFERT_STATUT_IDS_MAX} ids requis."}, status=400)
+
+        statut_connu = request.GET.get("statut", "en_attente")
+        timeout = min(max(timeout, 0), settings.TRANSFERT_STATUT_ATTENTE_MAX)
+        if not isinstance(request, ASGIRequest):
+            timeout = 0
+
+        # Abonnement avant la première lecture : un changement commité entre les deux n'est pas perdu
+        bus = obtenir_bus()
+        abonnement, _ = bus.abonner()
+        try:
+            limite = time.monotonic() + timeout
+            statuts = await lire_statuts(id_utilisateur, ids)
+            while all(statut == statut_connu for statut in statuts.values()):
+                reste = limite - time.monotonic()
+                if reste <= 0:
+                    break
+                evenement = await abonnement.suivant(min(reste, settings.TRANSFERT_STATUT_RELECTURE))
+                if evenement is not None and (
+                    evenement.type not in TYPES_STATUT.values() or evenement.donnees["id"] not in statuts
+                ):
+                    continue
+                statuts = await lire_statuts(id_utilisateur, ids)
+        finally:
+            bus.desabonner(abonnement)
+
+        return JsonResponse({
+            "demandes": [{"id": id, "statut": statuts[id]} for id in ids if id in statuts],
+            "change": any(statut != statut_connu for statut in statuts.values()),
+        })
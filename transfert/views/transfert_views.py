@@ -1,70 +1,343 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from ..models import Utilisateur, DemandeTransfert
-from .fcm_utils import envoyer_notification_fcm
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import Utilisateur, DemandeTransfert, DemandeTransfertArchive
+from ..serializers import HistoriqueDemandeSerializer
+from ..pagination import PageKeyset, CurseurInvalide
+from ..outbox import enfiler_notification
+from ..signals import demande_creee, statut_demande_change
+from ..authentication import JetonSessionAuthentication, UtilisateurJeton
+from ..archives import trouver_demande
+from ..baux import libre_pour, reserver_demandes, liberer_demandes
+from ..ussd import generer_code_ussd
+from ..points import SoldeInsuffisant, debiter_points
+from ..idempotence import executer_idempotent, calculer_empreinte, ConflitIdempotence
 
-# 📨 Soumission d'une demande de transfert
-class SoumissionTransfertView(APIView):
-    def post(self, request):
-        data = request.data
-        id_utilisateur = data.get('id_utilisateur')
-        numero_destinataire = data.get('numero_destinataire')
-        reseau = data.get('reseau')
-        montant = data.get('montant')
-        numero_wave = data.get('numero_wave')
-        methode_paiement = data.get('methode_paiement')
+STATUTS_FINAUX = ('valide', 'echec')
 
-        if not id_utilisateur or not numero_destinataire or not reseau or montant is None or not numero_wave or not methode_paiement:
-            return Response({"error": "Tous les champs sont obligatoires."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            montant = int(montant)
-            if montant <= 0:
-                return Response({"error": "Le montant doit être supérieur à 0."}, status=400)
-        except ValueError:
-            return Response({"error": "Montant invalide."}, status=400)
+# 🔹 Erreur métier renvoyée telle quelle au client (partagée par les vues sync et async)
+class ErreurDemande(Exception):
+    def __init__(self, message, code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.code = code
 
-        try:
-            utilisateur = Utilisateur.objects.get(id=id_utilisateur)
-        except Utilisateur.DoesNotExist:
-            return Response({"error": "Utilisateur introuvable."}, status=status.HTTP_404_NOT_FOUND)
 
-        demande = DemandeTransfert.objects.create(
-            utilisateur=utilisateur,
-            numero_destinataire=numero_destinataire,
-            reseau=reseau.lower(),
-            montant=montant,
-            numero_wave=numero_wave,
-            methode_paiement=methode_paiement.lower(),
-            statut='en_attente'
-        )
+# 🔹 Contrôle des champs d'une soumission ; id_jeton = utilisateur authentifié par jeton (ou None)
+def lire_soumission(data, id_jeton=None):
+    id_utilisateur = data.get('id_utilisateur')
+
+    if id_jeton is not None:
+        if id_utilisateur and str(id_utilisateur) != str(id_jeton):
+            raise ErreurDemande("Le jeton ne correspond pas à cet utilisateur.", status.HTTP_403_FORBIDDEN)
+        id_utilisateur = id_jeton
+    elif settings.TRANSFERT_JETON_OBLIGATOIRE:
+        raise ErreurDemande("Authentification requise.", status.HTTP_401_UNAUTHORIZED)
+
+    numero_destinataire = data.get('numero_destinataire')
+    reseau = data.get('reseau')
+    montant = data.get('montant')
+    numero_wave = data.get('numero_wave')
+    methode_paiement = data.get('methode_paiement')
+
+    if not id_utilisateur or not numero_destinataire or not reseau or montant is None or not numero_wave or not methode_paiement:
+        raise ErreurDemande("Tous les champs sont obligatoires.")
+
+    # 🔒 Le paiement en points débite un solde : jeton exigé même si TRANSFERT_JETON_OBLIGATOIRE est False
+    if id_jeton is None and str(methode_paiement).lower() == 'points':
+        raise ErreurDemande("Authentification requise pour payer en points.", status.HTTP_401_UNAUTHORIZED)
 
-        envoyer_notification_fcm(
+    try:
+        montant = int(montant)
+    except (TypeError, ValueError):
+        raise ErreurDemande("Montant invalide.")
+    if montant <= 0:
+        raise ErreurDemande("Le montant doit être supérieur à 0.")
+
+    return {
+        "id_utilisateur": id_utilisateur,
+        "numero_destinataire": numero_destinataire,
+        "reseau": reseau,
+        "montant": montant,
+        "numero_wave": numero_wave,
+        "methode_paiement": methode_paiement,
+    }
+
+
+# 🔔 Insertion de la demande (code USSD pré-généré), débit des points si payée en points
+#    et notification admin dans l'outbox, dans la même transaction
+def enregistrer_demande(utilisateur, champs):
+    reseau = champs["reseau"]
+    demande = DemandeTransfert(
+        utilisateur=utilisateur,
+        numero_destinataire=champs["numero_destinataire"],
+        reseau=reseau.lower(),
+        montant=champs["montant"],
+        numero_wave=champs["numero_wave"],
+        methode_paiement=champs["methode_paiement"].lower(),
+        statut='en_attente'
+    )
+    demande.code_ussd = generer_code_ussd(demande)
+
+    with transaction.atomic():
+        demande.save(force_insert=True)
+        if demande.methode_paiement == 'points':
+            try:
+                debiter_points(utilisateur.id, demande.montant, id_demande=demande.id)
+            except SoldeInsuffisant as e:
+                raise ErreurDemande(str(e))
+
+        enfiler_notification(
             titre="Nouvelle demande",
-            corps=f"{reseau.upper()} - {montant} F pour {numero_destinataire}"
+            corps=f"{reseau.upper()} - {champs['montant']} F pour {champs['numero_destinataire']}"
         )
 
-        return Response({"message": "Demande enregistrée avec succès.", "id_demande": demande.id}, status=status.HTTP_201_CREATED)
+        demande_creee.send(sender=DemandeTransfert, demande=demande)
+    return demande
+
+
+def reponse_soumission(demande):
+    return {"message": "Demande enregistrée avec succès.", "id_demande": demande.id}
+
+
+# 🔁 Soumission avec en-tête Idempotency-Key optionnel : un renvoi retourne la réponse
+#    d'origine sans nouvelle insertion ni notification. Retourne (code_http, reponse, rejouee).
+def soumettre_demande(utilisateur, champs, cle_idempotence=None):
+    def creer():
+        return status.HTTP_201_CREATED, reponse_soumission(enregistrer_demande(utilisateur, champs))
+
+    if not cle_idempotence:
+        return (*creer(), False)
+
+    if len(cle_idempotence) > 255:
+        raise ErreurDemande("Idempotency-Key trop longue.")
+
+    try:
+        return executer_idempotent(utilisateur, cle_idempotence, calculer_empreinte(champs), creer)
+    except ConflitIdempotence as e:
+        raise ErreurDemande(str(e), status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+def en_tetes_idempotence(rejouee):
+    return {"Idempotent-Replayed": "true"} if rejouee else None
+
+
+# 🔹 Pourquoi un UPDATE conditionnel n'a touché aucune ligne
+def motif_refus(demande):
+    if demande.statut != 'en_attente':
+        return "deja_traitee", "Demande déjà traitée."
+    return "reservee", "Demande réservée par un autre opérateur."
+
+
+# 🔹 Opérateur d'une requête : le compte admin authentifié, jamais une valeur envoyée par le client
+def nom_operateur(utilisateur):
+    return utilisateur.get_username() if utilisateur.is_authenticated and utilisateur.is_staff else None
+
+
+# 🔹 Passage d'une demande au statut 'valide'. UPDATE conditionnel : une demande déjà traitée,
+#    ou réservée par un autre opérateur, est refusée (409) au lieu d'être rechargée deux fois.
+def valider_demande(id_demande, code_ussd=None, operateur=None):
+    if not id_demande:
+        raise ErreurDemande("ID de la demande requis.")
+
+    try:
+        demande = DemandeTransfert.objects.get(id=id_demande)
+    except (DemandeTransfert.DoesNotExist, ValueError):
+        if str(id_demande).isdigit() and trouver_demande(id_demande) is not None:
+            raise ErreurDemande("Demande déjà traitée et archivée.", status.HTTP_409_CONFLICT)
+        raise ErreurDemande("Demande introuvable.", status.HTTP_404_NOT_FOUND)
+
+    champs = {'statut': 'valide', 'bail_expire': None}
+    if operateur:
+        champs['operateur'] = operateur
+    if code_ussd:
+        champs['code_ussd'] = code_ussd
+
+    with transaction.atomic():
+        mises_a_jour = DemandeTransfert.objects.filter(
+            libre_pour(operateur, timezone.now()), id=demande.id, statut='en_attente'
+        ).update(**champs)
+        if not mises_a_jour:
+            demande.refresh_from_db()
+            raise ErreurDemande(motif_refus(demande)[1], status.HTTP_409_CONFLICT)
+
+        ancien_statut = demande.statut
+        for champ, valeur in champs.items():
+            setattr(demande, champ, valeur)
+        statut_demande_change.send(sender=DemandeTransfert, demande=demande, ancien_statut=ancien_statut, operateur=operateur)
+    return demande
+
+
+# 📨 Soumission d'une demande de transfert (utilisateur pris dans le jeton "Authorization: Bearer")
+class SoumissionTransfertView(APIView):
+    authentication_classes = [JetonSessionAuthentication]
+
+    def post(self, request):
+        id_jeton = request.user.id if isinstance(request.user, UtilisateurJeton) else None
+        try:
+            champs = lire_soumission(request.data, id_jeton)
+        except ErreurDemande as e:
+            return Response({"error": e.message}, status=e.code)
+
+        try:
+            utilisateur = Utilisateur.objects.get(id=champs["id_utilisateur"])
+        except (Utilisateur.DoesNotExist, ValueError):
+            return Response({"error": "Utilisateur introuvable."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            code_http, reponse, rejouee = soumettre_demande(utilisateur, champs, request.headers.get('Idempotency-Key'))
+        except ErreurDemande as e:
+            return Response({"error": e.message}, status=e.code)
+
+        return Response(reponse, status=code_http, headers=en_tetes_idempotence(rejouee))
 
 # ✅ Validation demande
 class ValidationDemandeView(APIView):
     def post(self, request):
         data = request.data
-        id_demande = data.get('id_demande')
-        code_ussd = data.get('code_ussd', None)
+        try:
+            valider_demande(data.get('id_demande'), data.get('code_ussd', None), nom_operateur(request.user))
+        except ErreurDemande as e:
+            return Response({"error": e.message}, status=e.code)
+
+        return Response({"message": "Demande validée avec succès."}, status=status.HTTP_200_OK)
+
+
+# ✅ Validation par lot (compte admin) : [{id_demande, code_ussd, statut}] en une transaction.
+#    UPDATE conditionnel (statut='en_attente', bail libre ou à cet opérateur) : une demande déjà
+#    traitée n'est jamais écrasée, une demande réservée par un autre opérateur est refusée.
+class ValidationLotView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        data = request.data
+        elements = data if isinstance(data, list) else data.get('demandes')
+        operateur = nom_operateur(request.user)
+
+        if not isinstance(elements, list) or not elements:
+            return Response({"error": "Liste de demandes requise."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(elements) > settings.TRANSFERT_LOT_MAX:
+            return Response({"error": f"Maximum {settings.TRANSFERT_LOT_MAX} demandes par lot."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = []
+        for element in elements:
+            try:
+                ids.append(int(element.get('id_demande')))
+            except (AttributeError, TypeError, ValueError):
+                ids.append(None)
+
+        resultats = []
+        maintenant = timezone.now()
+        with transaction.atomic():
+            demandes = DemandeTransfert.objects.in_bulk([i for i in ids if i is not None])
+            manquants = [i for i in ids if i is not None and i not in demandes]
+            demandes.update(DemandeTransfertArchive.objects.in_bulk(manquants) if manquants else {})
+
+            for element, id_demande in zip(elements, ids):
+                if id_demande is None:
+                    resultats.append({"id_demande": None, "resultat": "invalide", "error": "ID de la demande requis."})
+                    continue
+
+                statut_demande = element.get('statut') or 'valide'
+                code_ussd = element.get('code_ussd')
+                if statut_demande not in STATUTS_FINAUX:
+                    resultats.append({"id_demande": id_demande, "resultat": "invalide", "error": "Statut invalide."})
+                    continue
+
+                demande = demandes.get(id_demande)
+                if demande is None:
+                    resultats.append({"id_demande": id_demande, "resultat": "introuvable"})
+                    continue
+
+                champs = {'statut': statut_demande, 'bail_expire': None}
+                if operateur:
+                    champs['operateur'] = operateur
+                if code_ussd:
+                    champs['code_ussd'] = code_ussd
 
-        if not id_demande:
-            return Response({"error": "ID de la demande requis."}, status=status.HTTP_400_BAD_REQUEST)
+                if demande.statut != 'en_attente' or not DemandeTransfert.objects.filter(
+                    libre_pour(operateur, maintenant), id=id_demande, statut='en_attente'
+                ).update(**champs):
+                    if demande.statut == 'en_attente':
+                        demande.refresh_from_db()
+                    resultats.append({"id_demande": id_demande, "resultat": motif_refus(demande)[0], "statut": demande.statut})
+                    continue
+
+                ancien_statut = demande.statut
+                for champ, valeur in champs.items():
+                    setattr(demande, champ, valeur)
+                statut_demande_change.send(sender=DemandeTransfert, demande=demande, ancien_statut=ancien_statut, operateur=operateur)
+                resultats.append({"id_demande": id_demande, "resultat": statut_demande})
+
+        traitees = sum(1 for r in resultats if r["resultat"] in STATUTS_FINAUX)
+        return Response({"message": f"{traitees} demande(s) traitée(s).", "resultats": resultats}, status=status.HTTP_200_OK)
+
+
+# 🙋 Réservation des prochaines demandes en attente : {nombre, duree, reseau}
+#    L'opérateur est le compte admin authentifié. Chaque opérateur reçoit des demandes distinctes,
+#    à traiter avant `bail_expire` ; avec `reseau`, uniquement celles de son couloir (une SIM par réseau)
+class ReservationView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        data = request.data
+        operateur = nom_operateur(request.user)
 
         try:
-            demande = DemandeTransfert.objects.get(id=id_demande)
-        except DemandeTransfert.DoesNotExist:
-            return Response({"error": "Demande introuvable."}, status=status.HTTP_404_NOT_FOUND)
+            nombre = int(data.get('nombre', 1))
+            duree = int(data.get('duree', settings.TRANSFERT_BAIL_DUREE))
+        except (TypeError, ValueError):
+            return Response({"error": "nombre et duree doivent être des entiers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= nombre <= settings.TRANSFERT_RESERVATION_MAX:
+            return Response({"error": f"nombre entre 1 et {settings.TRANSFERT_RESERVATION_MAX}."}, status=status.HTTP_400_BAD_REQUEST)
+        duree = max(1, min(duree, settings.TRANSFERT_BAIL_DUREE_MAX))
 
-        demande.statut = 'valide'
-        if code_ussd:
-            demande.code_ussd = code_ussd
-        demande.save()
+        filtres = {}
+        if data.get('reseau'):
+            filtres['reseau'] = str(data['reseau']).lower()
+            if filtres['reseau'] not in settings.TRANSFERT_RESEAUX:
+                return Response({"error": "Réseau inconnu."}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"message": "Demande validée avec succès."}, status=status.HTTP_200_OK)
+        demandes, expire = reserver_demandes(operateur, nombre, duree, **filtres)
+        return Response({"demandes": demandes, "bail_expire": expire if demandes else None})
+
+
+# 🔓 Libération des réservations du compte admin authentifié : {ids?} (toutes si ids absent)
+class LiberationView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        data = request.data
+        operateur = nom_operateur(request.user)
+
+        ids = data.get('ids')
+        if ids is not None and (not isinstance(ids, list) or not all(str(i).isdigit() for i in ids)):
+            return Response({"error": "ids doit être une liste d'identifiants."}, status=status.HTTP_400_BAD_REQUEST)
+
+        liberees = liberer_demandes(operateur, ids)
+        return Response({"message": f"{liberees} demande(s) libérée(s).", "liberees": liberees})
+
+
+# 🧾 Historique des demandes de l'utilisateur du jeton (table chaude + archive, pagination keyset)
+class HistoriqueView(APIView):
+    authentication_classes = [JetonSessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            page = PageKeyset(request)
+        except CurseurInvalide as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        champs = HistoriqueDemandeSerializer.Meta.fields
+        demandes = page.paginer(*(
+            modele.objects.filter(utilisateur_id=request.user.id).values(*champs)
+            for modele in (DemandeTransfert, DemandeTransfertArchive)
+        ))
+        return Response(page.reponse(HistoriqueDemandeSerializer(demandes, many=True).data))